@@ -1,10 +1,14 @@
 import os
+import sys
 import git
 
 
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores import FAISS
-from langchain_community.document_loaders import DirectoryLoader
+from langchain_community.document_loaders import UnstructuredFileLoader
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+from incremental_index import list_files, sync_index
 
 # Load Env Variables
 from dotenv import load_dotenv
@@ -12,7 +16,7 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # For BedRock
-from langchain_aws import BedrockEmbeddings
+from embedding_cache import get_embeddings
 
 
 repo_url = "https://github.com/juice-shop/juice-shop.git"
@@ -28,13 +32,22 @@ else:
         print(f"An error occurred while cloning the repository: {e}")
 
 
-embeddings = BedrockEmbeddings(model_id="amazon.titan-embed-text-v2:0")
+embeddings = get_embeddings(model_id="amazon.titan-embed-text-v2:0")
+
 
+# Only re-embed new or changed files; set INCREMENTAL_INDEX=false to rebuild from scratch
+incremental = os.getenv("INCREMENTAL_INDEX", "true").lower() == "true"
 
-loader = DirectoryLoader(repo_path, glob="**/*.*", silent_errors=True)  # Load all files
-documents = loader.load()
+files = list_files(repo_path, glob="**/*.*")  # Load all files
 
 text_splitter = RecursiveCharacterTextSplitter(chunk_size=8000, chunk_overlap=100)
-texts = text_splitter.split_documents(documents)
-db = FAISS.from_documents(texts, embeddings)
-db.save_local("../vector_databases/juice_shop.faiss")
+db = sync_index(
+    "../vector_databases/juice_shop.faiss",
+    files,
+    lambda file_path: UnstructuredFileLoader(file_path).load(),
+    text_splitter,
+    embeddings,
+    incremental=incremental,
+    source={"type": "code", "chunk_size": 8000, "chunk_overlap": 100},
+)
+print(embeddings.report())
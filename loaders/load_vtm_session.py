@@ -1,4 +1,5 @@
 import os
+import sys
 import git
 
 
@@ -12,49 +13,45 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # For BedRock
-from langchain_aws import BedrockEmbeddings
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+from embedding_cache import get_embeddings
+from embedding_executor import build_index
+from index_types import save_store
 
-import base64
-import xml.etree.ElementTree as ET
+from session_store import open_session_store
 
 xml_file = 'data/vtm-session.xml'
 
-xml = ET.parse(xml_file)
-root = xml.getroot()
-
-print(f"Parsing {len(root)} requests")
-
-embeddings = BedrockEmbeddings(model_id='amazon.titan-embed-text-v2:0')
-
-documents = []
-count = 1
-for item in root:
-    print(f"=> {count}/{len(root)}: {item.find('url').text}")
-    request = item.find("request").text
-    if item.find("request").attrib['base64'] == 'true':
-        request = base64.b64decode(request).decode('utf-8')
-    response = item.find("response").text
-    if item.find("response").attrib['base64'] == 'true':
-        response = base64.b64decode(response).decode('utf-8')
-    content = f"{request}\n\n{response}"
-    documents.append(
-        Document(
-            page_content=content,
+embeddings = get_embeddings(model_id='amazon.titan-embed-text-v2:0')
+
+
+def session_documents(xml_file):
+    for item in open_session_store(xml_file).items():
+        print(f"=> {item.id}: {item.url}")
+        yield Document(
+            page_content=f"{item.request}\n\n{item.response}",
             metadata={
-                "id": count,
-                "method": item.find("method").text,
-                "url": item.find("url").text,
+                "id": item.id,
+                "method": item.method,
+                "url": item.url,
+                "host": item.host,
+                "path": item.path,
+                "status": item.status,
+                "mimetype": item.mimetype,
             }
         )
-    )
-    count += 1
-        
+
 
 text_splitter = RecursiveCharacterTextSplitter(
     chunk_size=8000, chunk_overlap=100
 )
-texts = text_splitter.split_documents(documents)
+texts = text_splitter.split_documents(session_documents(xml_file))
 print(f"Split into {len(texts)} chunks")
 # Create FAISS vector store from the documents
-db = FAISS.from_documents(texts, embeddings)
-db.save_local("vector_databases/vtm_session.faiss")
\ No newline at end of file
+db = build_index(texts, embeddings)
+save_store(
+    db,
+    "vector_databases/vtm_session.faiss",
+    source={"type": "http_session", "chunk_size": 8000, "chunk_overlap": 100},
+)
+print(embeddings.report())
@@ -4,7 +4,8 @@ from langchain_ollama import OllamaLLM as Ollama
 from langchain_core.runnables import RunnablePassthrough
 from langchain_core.output_parsers import StrOutputParser
 from langchain_community.vectorstores import FAISS
-from langchain_aws import BedrockEmbeddings
+from mmr import mmr_retriever
+from vector_store_registry import get_vector_store
 from langchain_core.runnables.history import RunnableWithMessageHistory
 from langchain_core.chat_history import BaseChatMessageHistory
 from langchain_core.messages import HumanMessage, AIMessage, BaseMessage, get_buffer_string
@@ -16,16 +17,9 @@ from dotenv import load_dotenv
 load_dotenv()
 
 faiss_db_path = "../vector_databases/juice_shop.faiss"
-db = FAISS.load_local(
-    faiss_db_path,
-    BedrockEmbeddings(model_id="amazon.titan-embed-text-v2:0"),
-    allow_dangerous_deserialization=True,
-)
+db = get_vector_store(faiss_db_path)
 
-retriever = db.as_retriever(
-    search_type="mmr",
-    search_kwargs={"k": 30},
-)
+retriever = mmr_retriever(db, k=30)
 
 # Initialize the ChatBedrock LLM
 #llm = ChatBedrock(
@@ -13,21 +13,15 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # For BedRock
-from langchain_aws import ChatBedrock
-from langchain_aws import BedrockEmbeddings
+from llm_factory import get_llm
+from mmr import mmr_retriever
+from vector_store_registry import get_vector_store
 
 
 faiss_db_path = "../vector_databases/juice_shop.faiss"
-db = FAISS.load_local(
-    faiss_db_path,
-    BedrockEmbeddings(model_id="amazon.titan-embed-text-v2:0"),
-    allow_dangerous_deserialization=True,
-)
+db = get_vector_store(faiss_db_path)
 
-retriever = db.as_retriever(
-    search_type="mmr",  # Also test "similarity"
-    search_kwargs={"k": 20},
-)
+retriever = mmr_retriever(db, k=20)
 
 system_prompt_template = """
 Analyze source code and provide detailed security and functional insights as requested.
@@ -43,10 +37,7 @@ prompt = ChatPromptTemplate.from_messages(
     ]
 )
 
-llm = ChatBedrock(
-    model_id="us.anthropic.claude-3-5-haiku-20241022-v1:0",
-    model_kwargs={"temperature": 0.6},
-)
+llm = get_llm(temperature=0.6)
 
 chain = (
     {"context": retriever, "question": RunnablePassthrough()}
@@ -9,21 +9,14 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # For BedRock
-from langchain_aws import ChatBedrock
-from langchain_aws import BedrockEmbeddings
+from llm_factory import get_llm
+from hybrid_retriever import get_hybrid_retriever
 
 
 faiss_db_path = "../vector_databases/juice_shop.faiss"
-db = FAISS.load_local(
-    faiss_db_path,
-    BedrockEmbeddings(model_id="amazon.titan-embed-text-v2:0"),
-    allow_dangerous_deserialization=True,
-)
 
-retriever = db.as_retriever(
-    search_type="mmr",  # Also test "similarity"
-    search_kwargs={"k": 8},
-)
+# Fuses BM25 and vector ranks so exact identifiers in the question are found
+retriever = get_hybrid_retriever(faiss_db_path, k=6)
 
 system_prompt_template = """
 You are a highly skilled and detail-oriented code review assistant with expertise in both application security and functional code analysis. Your role is to assist developers and security professionals by providing accurate, concise, and actionable insights.
@@ -59,10 +52,7 @@ prompt = ChatPromptTemplate.from_messages(
 # UNCOMMENT FOR OLLAMA/LLAMA
 # llm = Ollama(model="llama3.1", temperature=0.6)
 
-llm = ChatBedrock(
-    model_id="us.anthropic.claude-3-5-haiku-20241022-v1:0",
-    model_kwargs={"temperature": 0.6},
-)
+llm = get_llm(temperature=0.6)
 
 
 knowledge_base_file_path = "../data/juice_shop_knowledgebase.md"
@@ -1,6 +1,9 @@
 import os
-from langchain_aws import ChatBedrock
-from langchain_aws import BedrockEmbeddings
+from llm_factory import get_llm
+from embedding_cache import get_embeddings
+from metadata_index import filtered_rows, filters_from_env, load_metadata_index
+from mmr import mmr_retriever
+from vector_store_registry import get_vector_store
 from langchain_core.runnables import RunnablePassthrough
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
@@ -18,24 +21,19 @@ load_dotenv()
 
 #llm = Ollama(model="deepseek-r1", temperature=0.2)
 
-llm = ChatBedrock(
-    model_id='us.anthropic.claude-3-5-haiku-20241022-v1:0',
-    model_kwargs={"temperature": 0.2},
-)
+llm = get_llm(temperature=0.2)
 
-embeddings = BedrockEmbeddings(model_id='amazon.titan-embed-text-v2:0')
+embeddings = get_embeddings(model_id='amazon.titan-embed-text-v2:0')
 
 faiss_db_path = "../vector_databases/vtm_session.faiss"
-db = FAISS.load_local(
-    faiss_db_path, 
-    embeddings,
-    allow_dangerous_deserialization=True
-)
-
-retriever = db.as_retriever(
-    search_type="mmr", # Also test "similarity"
-    search_kwargs={"k": 20},
-)
+db = get_vector_store(faiss_db_path, embeddings)
+
+# Optionally restrict retrieval to a slice of the session, e.g.
+# SESSION_FILTER_METHOD=POST or SESSION_FILTER_HOST=vtm.rdpt.dev
+# (status and mimetype need a store built by loaders/load_vtm_session.py)
+filters = filters_from_env()
+rows = filtered_rows(load_metadata_index(db, faiss_db_path), filters) if filters else None
+retriever = mmr_retriever(db, k=20, rows=rows)
 
 system_prompt_template = """
 ROLE:
@@ -5,7 +5,9 @@ from langchain_community.document_loaders.parsers import LanguageParser
 from langchain.text_splitter import Language
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores import FAISS
-from langchain_aws import BedrockEmbeddings
+from langchain_core.document_loaders import Blob
+from embedding_cache import get_embeddings
+from incremental_index import list_files, sync_index
 
 # Load Env Variables
 from dotenv import load_dotenv
@@ -25,27 +27,30 @@ else:
     except Exception as e:
         print(f"An error occurred while cloning the repository: {e}")
 
-loader = GenericLoader.from_filesystem(
-    local_path,
-    glob="**/*",
-    # CHANGE .rb TO THE RELEVANT FILE EXTENSION
-    suffixes=[".rb"],
-    # CHANGE Language.RUBY TO THE RELEVANT LANGUAGE
-    parser=LanguageParser(language=Language.RUBY),
-    show_progress=True,
-)
+# CHANGE .rb TO THE RELEVANT FILE EXTENSION
+files = list_files(local_path, glob="**/*", suffixes=[".rb"])
+# CHANGE Language.RUBY TO THE RELEVANT LANGUAGE
+parser = LanguageParser(language=Language.RUBY)
 
-documents = loader.load()
+# Only re-embed new or changed files; set INCREMENTAL_INDEX=false to rebuild from scratch
+incremental = os.getenv("INCREMENTAL_INDEX", "true").lower() == "true"
 
-embeddings = BedrockEmbeddings(model_id="amazon.titan-embed-text-v2:0")
+embeddings = get_embeddings(model_id="amazon.titan-embed-text-v2:0")
 # CHANGE Language.RUBY TO THE RELEVANT LANGUAGE
 splitter = RecursiveCharacterTextSplitter.from_language(
     language=Language.RUBY, chunk_size=8000, chunk_overlap=100
 )
-texts = splitter.split_documents(documents)
 
 # CHANGE THE DB NAME TO THE RELEVANT DB NAME
 db_name = "bridge_troll"
 
-db = FAISS.from_documents(texts, embeddings)
-db.save_local(f"../vector_databases/{db_name}_faiss")
+db = sync_index(
+    f"../vector_databases/{db_name}_faiss",
+    files,
+    lambda file_path: parser.parse(Blob.from_path(file_path)),
+    splitter,
+    embeddings,
+    incremental=incremental,
+    source={"type": "code", "chunk_size": 8000, "chunk_overlap": 100},
+)
+print(embeddings.report())
@@ -1,9 +1,10 @@
 from langchain.prompts import PromptTemplate
-from langchain_aws import ChatBedrock
+from llm_factory import get_llm
 from langchain_core.runnables import RunnablePassthrough
 from langchain_core.output_parsers import StrOutputParser
 from langchain_community.vectorstores import FAISS
-from langchain_aws import BedrockEmbeddings
+from mmr import mmr_retriever
+from vector_store_registry import get_vector_store
 from langchain_core.runnables.history import RunnableWithMessageHistory
 from langchain_core.chat_history import BaseChatMessageHistory
 from langchain_core.messages import HumanMessage, AIMessage, BaseMessage, get_buffer_string
@@ -15,22 +16,12 @@ from dotenv import load_dotenv
 load_dotenv()
 
 faiss_db_path = "../vector_databases/acmeco_sec_guide_faiss"
-db = FAISS.load_local(
-    faiss_db_path,
-    BedrockEmbeddings(model_id="amazon.titan-embed-text-v2:0"),
-    allow_dangerous_deserialization=True,
-)
+db = get_vector_store(faiss_db_path)
 
-retriever = db.as_retriever(
-    search_type="mmr",
-    search_kwargs={"k": 30},
-)
+retriever = mmr_retriever(db, k=30)
 
-# Initialize the ChatBedrock LLM
-llm = ChatBedrock(
-    model_id="us.anthropic.claude-3-5-haiku-20241022-v1:0",
-    model_kwargs={"temperature": 0.1},
-)
+# Initialize the shared, rate-limited Bedrock LLM
+llm = get_llm(temperature=0.1)
 
 # Define the chat template with chat history
 chat_template = """
@@ -8,9 +8,11 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # For BedRock
-from langchain_aws import BedrockEmbeddings
+from embedding_cache import get_embeddings
+from embedding_executor import build_index
+from index_types import save_store
 
-embeddings = BedrockEmbeddings(model_id="amazon.titan-embed-text-v2:0")
+embeddings = get_embeddings(model_id="amazon.titan-embed-text-v2:0")
 
 loader = PyPDFLoader(
     "../data/Acme_Co_Security_Guide.pdf",
@@ -21,5 +23,10 @@ documents = loader.load()
 text_splitter = RecursiveCharacterTextSplitter(chunk_size=8000, chunk_overlap=100)
 
 texts = text_splitter.split_documents(documents)
-db = FAISS.from_documents(texts, embeddings)
-db.save_local("../vector_databases/acmeco_sec_guide_faiss")
+db = build_index(texts, embeddings)
+save_store(
+    db,
+    "../vector_databases/acmeco_sec_guide_faiss",
+    source={"type": "guide", "chunk_size": 8000, "chunk_overlap": 100},
+)
+print(embeddings.report())
@@ -1,6 +1,14 @@
 import os
-from langchain_aws import ChatBedrock
-from langchain_aws import BedrockEmbeddings
+import sys
+import asyncio
+from operator import itemgetter
+from llm_factory import get_llm
+from embedding_cache import get_embeddings
+from metadata_index import filtered_rows, filters_from_env, load_metadata_index
+from mmr import mmr_retriever
+from session_store import open_session_store
+from endpoint_templates import endpoint_groups
+from vector_store_registry import get_vector_store
 from langchain_core.runnables import RunnablePassthrough
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
@@ -18,24 +26,33 @@ load_dotenv()
 
 #llm = Ollama(model="deepseek-r1", temperature=0.2)
 
-llm = ChatBedrock(
-    model_id='us.anthropic.claude-3-5-haiku-20241022-v1:0',
-    model_kwargs={"temperature": 0.2},
-)
+llm = get_llm(temperature=0.2)
 
-embeddings = BedrockEmbeddings(model_id='amazon.titan-embed-text-v2:0')
+embeddings = get_embeddings(model_id='amazon.titan-embed-text-v2:0')
 
+xml_file = '../data/vtm-session.xml'
 faiss_db_path = "../vector_databases/vtm_session.faiss"
-db = FAISS.load_local(
-    faiss_db_path, 
-    embeddings,
-    allow_dangerous_deserialization=True
-)
-
-retriever = db.as_retriever(
-    search_type="mmr", # Also test "similarity"
-    search_kwargs={"k": 8},
-)
+db = get_vector_store(faiss_db_path, embeddings)
+
+# "partitioned" walks the session one endpoint group at a time so every
+# endpoint is analyzed; "global" runs a single top-k retrieval over the session
+mode = os.getenv("RETRIEVAL_MODE", "partitioned")
+
+# Chunks retrieved per endpoint group, and groups analyzed concurrently
+partition_k = int(os.getenv("PARTITION_K", "8"))
+workers = int(os.getenv("DAST_WORKERS", "4"))
+
+# Optionally restrict the analysis to a slice of the session, e.g.
+# SESSION_FILTER_METHOD=POST SESSION_FILTER_PATH_PREFIX=/taskManager/
+filters = filters_from_env()
+metadata_index = load_metadata_index(db, faiss_db_path)
+if filters and mode == "global":
+    # Every matching request is retrieved, so the filtered analysis has full recall
+    rows = filtered_rows(metadata_index, filters)
+    print(f"{len(rows)} chunks match {filters}")
+    retriever = mmr_retriever(db, k=max(len(rows), 1), rows=rows)
+else:
+    retriever = mmr_retriever(db, k=8)
 
 system_prompt_template = """
 You are a highly analytical agent specializing in both security and functional review. 
@@ -85,5 +102,57 @@ chain = (
     | StrOutputParser()
 )
 
-for chunk in chain.stream(question):
+partition_chain = (
+    {"context": itemgetter("context"), "question": itemgetter("question")}
+    | prompt
+    | llm
+    | StrOutputParser()
+)
+
+
+async def analyze_partitions(groups):
+    """Retrieve and analyze each endpoint group concurrently, printing results in session order."""
+    # The question is the same for every group, so it is only embedded once
+    query_embedding = embeddings.embed_query(question)
+    semaphore = asyncio.Semaphore(workers)
+    finished = {}
+    next_index = 0
+
+    def flush():
+        nonlocal next_index
+        while next_index in finished:
+            print(finished.pop(next_index), flush=True)
+            next_index += 1
+
+    async def worker(index, ids):
+        item = store.get(ids[0])
+        header = f"=> {index + 1}/{len(groups)}: {item.method} {item.url} ({len(ids)} requests)"
+        rows = metadata_index.rows(ids=ids)
+        if not rows:
+            finished[index] = f"{header}\nNot in {faiss_db_path}; rebuild it with load_vtm_session.py\n"
+            flush()
+            return
+        docs = mmr_retriever(db, k=partition_k, rows=rows).search_by_vector(query_embedding)
+        context = "\n\n".join(doc.page_content for doc in docs)
+        async with semaphore:
+            try:
+                result = await partition_chain.ainvoke({"context": context, "question": question})
+            except Exception as e:
+                result = f"Error: {e}"
+        finished[index] = f"{header}\n{result}\n"
+        flush()
+
+    await asyncio.gather(*(worker(index, ids) for index, ids in enumerate(groups)))
+
+
+if mode == "global":
+    for chunk in chain.stream(question):
                 print(chunk, end="", flush=True)
+else:
+    store = open_session_store(xml_file)
+    # The session store records every filter field, whatever the FAISS store kept
+    groups = list(endpoint_groups(store.items(**filters)).values())
+    if not groups:
+        sys.exit(f"No requests in {xml_file} match {filters}")
+    print(f"Analyzing {len(groups)} endpoint groups covering {sum(map(len, groups))} requests ({workers} workers)")
+    asyncio.run(analyze_partitions(groups))
@@ -1,7 +1,10 @@
 import os
-from langchain_aws import ChatBedrock
-from langchain_aws import BedrockEmbeddings
+import asyncio
+import json
+from llm_factory import get_llm, get_response_cache
+from embedding_cache import get_embeddings
 from langchain_core.runnables import RunnablePassthrough
+from operator import itemgetter
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.documents import Document
@@ -9,8 +12,10 @@ from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores import FAISS
 #from langchain_ollama import OllamaLLM as Ollama
 
-import base64
-import xml.etree.ElementTree as ET
+from session_store import open_session_store
+from endpoint_templates import endpoint_groups
+from http_params import has_user_input, parse_request, summarize
+from dast_findings import InjectionVerdict, finding, format_finding
 
 # Load Env Variables
 from dotenv import load_dotenv
@@ -18,25 +23,33 @@ load_dotenv()
 
 xml_file = '../data/vtm-session.xml'
 
-xml = ET.parse(xml_file)
-root = xml.getroot()
-print(f"Parsing {len(root)} requests")
+# "deduplicated" analyzes one representative request per endpoint template
+# and applies its verdict to every request in the group; "full" analyzes all
+mode = os.getenv("DAST_MODE", "deduplicated")
+
+# Number of requests analyzed concurrently
+workers = int(os.getenv("DAST_WORKERS", "4"))
+
+# Results are appended as each request completes; re-running resumes
+# from where the previous run stopped. Delete the file to start over.
+output_file = '../data/dynamic_analysis_output.jsonl'
 
 #llm = Ollama(model="deepseek-r1", temperature=0.2)
 
-llm = ChatBedrock(
-    model_id='us.anthropic.claude-3-5-haiku-20241022-v1:0',
-    model_kwargs={"temperature": 0.2},
-)
+llm = get_llm(temperature=0.2)
 
-embeddings = BedrockEmbeddings(model_id='amazon.titan-embed-text-v2:0')
+embeddings = get_embeddings(model_id='amazon.titan-embed-text-v2:0')
 
 system_prompt_template = """
 You are a highly analytical agent specializing in both security and functional review. 
 Your task is to analyze an HTTP Request for user-controllable parameters that could be used for injection exploits.
+The request is given as its request line and Host header, followed by a JSON object of the parameters
+extracted from it, grouped by location (path, query, body, cookie).
 
 Context for analysis:
+<content>
 {context}
+</content>
 
 Remember to:
 - Identify areas where more investigation might be needed
@@ -53,63 +66,103 @@ prompt = ChatPromptTemplate.from_messages(
 )
 
 question = """"
-Please analyze the following HTTP Request for possibility user-controlled parameters that could be used for injection exploits such as SQL Injection, Command Injection, or other types of injection attacks:
-
-<content>
-{content}
-</content>
+Please analyze the HTTP Request in the content for possibility user-controlled parameters that could be used for injection exploits such as SQL Injection, Command Injection, or other types of injection attacks.
 
 ONLY respond with the following information:
-- URL: (str) The full URL of the request in the format: http://example.com/path
-- HTTP Method: (str) The HTTP Method of the request
-- Parameters: (str) The parameters of the request
-- Possible Injection: (str) Yes or No
+- Parameters: (list) The names of the user-controllable parameters of the request
+- Possible Injection: (bool) Whether an injection exploit may be possible
 - Justification: (str) A brief justification ONLY if injection exploit may be possible
 
 DO NOT PROVIDE ADDITIONAL INFORMATION.
 """
 
 chain = (
-    { "context": RunnablePassthrough() , "question": RunnablePassthrough()}
+    { "context": itemgetter("content"), "question": itemgetter("question")}
     | prompt
-    | llm
-    | StrOutputParser()
+    | llm.with_structured_output(InjectionVerdict)
+)
+
+
+
+def load_completed(path):
+    """Return the ids of the requests that already have results in path."""
+    completed = set()
+    if os.path.isfile(path):
+        with open(path, 'r') as f:
+            for line in f:
+                try:
+                    completed.add(json.loads(line)["id"])
+                except (ValueError, KeyError):
+                    continue  # Ignore a line truncated by a crash
+    return completed
+
+
+async def run(groups, out):
+    """
+    Analyze the representative of each group with abatch_as_completed, capped
+    at workers concurrent calls, and fan each verdict out to every member.
+    Results are written in session order as soon as the prefix is complete,
+    so an interrupted run resumes where it stopped.
+    """
+    finished = {}
+    next_index = 0
+
+    def flush():
+        nonlocal next_index
+        while next_index in finished:
+            for record in finished.pop(next_index) or []:
+                out.write(json.dumps(record) + "\n")
+            out.flush()
+            next_index += 1
+
+    def complete(index, verdict):
+        ids = groups[index]
+        url = store.get(ids[0]).url
+        if isinstance(verdict, Exception):
+            finished[index] = None
+            print(f"=> {index + 1}/{len(groups)}: {url} Error: {verdict}\n")
+        else:
+            finished[index] = [finding(store.get(member_id), verdict) for member_id in ids]
+            print(f"=> {index + 1}/{len(groups)}: {url} ({len(ids)} requests)\n{format_finding(finished[index][0])}\n")
+        flush()
+
+    # Requests without user input are settled without a model call
+    inputs = {}
+    for index, ids in enumerate(groups):
+        parsed = parse_request(store.get(ids[0]).request)
+        if has_user_input(parsed):
+            inputs[index] = {"question": question, "content": summarize(parsed)}
+        else:
+            complete(index, InjectionVerdict(
+                parameters=[], possible_injection=False, justification="No user-controllable parameters"
+            ))
+
+    indexes = list(inputs)
+    batch = chain.abatch_as_completed(
+        [inputs[index] for index in indexes], config={"max_concurrency": workers}, return_exceptions=True
+    )
+    async for position, verdict in batch:
+        complete(indexes[position], verdict)
+
+
+store = open_session_store(xml_file)
+if mode == "full":
+    groups = [[item.id] for item in store.items()]
+else:
+    groups = list(endpoint_groups(store.items()).values())
+
+completed = load_completed(output_file)
+remaining = [ids for ids in groups if not set(ids) <= completed]
+print(
+    f"Analyzing {len(groups)} of {store.count()} requests ({mode} mode, {workers} workers), "
+    f"{len(groups) - len(remaining)} already done"
 )
 
-count = 1
-urls = []
-output = ""
-for item in root:
-    print(f"=> {count}/{len(root)}: {item.find('url').text}")
-    output += f"Request {item.find('url').text}:\n"
-    # Skip duplicate URLs, if needed
-    #url = item.find('url').text
-    #if url in urls:
-    #    print("=> Duplicate URL, skipping")
-    #    continue
-    #urls.append(item.find('url').text)
-    request = item.find("request").text
-    if item.find("request").attrib['base64'] == 'true':
-        request = base64.b64decode(request).decode('utf-8')
-    count = count+1
-
-    try: 
-        answer = ""
-        for chunk in chain.stream({"question": question, "content": request}):
-            print(chunk, end="", flush=True)
-            #response_array.append(chunk)
-  
-            answer += chunk
-        output += answer + "\n\n"
-
-        print("\n=> Complete\n")
-    except Exception as e:
-        print(f"=> Error: {e}")
-
-# Save the output to a file
-output_file = 'data/dynamic_analysis_output.txt'
-with open(output_file, 'w') as f:
-    f.write(output)
-    f.close()
+with open(output_file, 'a') as out:
+    asyncio.run(run(remaining, out))
+
 print(f"Output saved to {output_file}")
+response_cache = get_response_cache()
+if response_cache is not None:
+    print(response_cache.report())
 print("=" * 50)
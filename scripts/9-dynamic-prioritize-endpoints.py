@@ -1,7 +1,14 @@
 import os
-from langchain_aws import ChatBedrock
-from langchain_aws import BedrockEmbeddings
+import sys
+import asyncio
+import heapq
+from collections import Counter
+from typing import List
+from pydantic import BaseModel, Field
+from llm_factory import get_llm
+from embedding_cache import get_embeddings
 from langchain_core.runnables import RunnablePassthrough
+from dast_findings import format_finding, priority_score, read_findings, read_text_findings
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.documents import Document
@@ -16,19 +23,54 @@ import xml.etree.ElementTree as ET
 from dotenv import load_dotenv
 load_dotenv()
 
-txt_file = '../data/dynamic_analysis_output.txt'
-
-with open(txt_file, 'r') as f:
-    content = f.read()
+jsonl_file = '../data/dynamic_analysis_output.jsonl'
+# Free-text report shipped with the repo, used until script 8 has written the JSONL
+text_file = '../data/dynamic_analysis_output.txt'
+
+# "hierarchical" ranks token-budgeted batches concurrently and merges their
+# top-k in tournament rounds down to one final report; "batched" reports on
+# fixed-size batches independently
+mode = os.getenv("PRIORITIZE_MODE", "hierarchical")
+
+# Findings sent to the LLM per call in batched mode, and how many of the
+# highest ranked candidates are prioritized at most
+batch_size = int(os.getenv("PRIORITIZE_BATCH_SIZE", "25"))
+max_candidates = int(os.getenv("PRIORITIZE_MAX_CANDIDATES", "500"))
+
+# Hierarchical mode: estimated input tokens of findings per call, endpoints each
+# batch carries into the next round, and concurrent ranking calls per round
+token_budget = int(os.getenv("PRIORITIZE_TOKEN_BUDGET", "6000"))
+top_k = int(os.getenv("PRIORITIZE_TOP_K", "5"))
+fan_out = int(os.getenv("PRIORITIZE_FANOUT", "4"))
+
+
+def candidate_findings(records):
+    """Stream flagged findings, collapsing requests repeated by endpoint dedup."""
+    seen = set()
+    for record in records:
+        key = (record["method"], record["url"])
+        if record["possible_injection"] and key not in seen:
+            seen.add(key)
+            yield record
+
+
+if os.path.isfile(jsonl_file):
+    findings = read_findings(jsonl_file)
+elif os.path.isfile(text_file):
+    print(f"{jsonl_file} not found, reading the free-text report {text_file}")
+    findings = read_text_findings(text_file)
+else:
+    sys.exit(f"No findings in {jsonl_file}; run 8-dynamic-investigate-parameters.py first")
+
+# Deterministic pre-rank so only the most promising candidates reach the LLM
+candidates = heapq.nlargest(max_candidates, candidate_findings(findings), key=priority_score)
+print(f"Prioritizing {len(candidates)} candidate endpoints ({mode} mode)")
 
 #llm = Ollama(model="deepseek-r1", temperature=0.2)
 
-llm = ChatBedrock(
-    model_id='us.anthropic.claude-3-5-haiku-20241022-v1:0',
-    model_kwargs={"temperature": 0.2},
-)
+llm = get_llm(temperature=0.2)
 
-embeddings = BedrockEmbeddings(model_id='amazon.titan-embed-text-v2:0')
+embeddings = get_embeddings(model_id='amazon.titan-embed-text-v2:0')
 
 system_prompt_template = """
 You are a highly analytical agent specializing in both security and functional review. 
@@ -74,7 +116,127 @@ chain = (
     | StrOutputParser()
 )
 
-for chunk in chain.stream({"question": question, "content": content}):
-    print(chunk, end="", flush=True)
+
+
+class BatchRanking(BaseModel):
+    ranked_ids: List[int] = Field(description="IDs of the endpoints ordered from highest to lowest security risk")
+
+
+rank_prompt = ChatPromptTemplate.from_messages(
+            [
+                ("system", system_prompt_template),
+                ("human", """<question>
+Rank the following endpoints by the security risk of their potential injection vulnerabilities,
+highest risk first. Respond only with their IDs in ranked order.
+
+<content>
+{content}
+</content>
+</question>""")
+            ]
+)
+
+rank_chain = rank_prompt | llm.with_structured_output(BatchRanking, include_raw=True)
+
+# Calls and tokens per tournament level
+usage = {}
+
+
+def record_usage(level, message):
+    stats = usage.setdefault(level, Counter())
+    if message is not None and message.response_metadata.get("cached"):
+        # Replayed from the response cache with the original call's usage
+        stats["cached"] += 1
+        return
+    stats["calls"] += 1
+    if message is not None and getattr(message, "usage_metadata", None):
+        stats["input_tokens"] += message.usage_metadata.get("input_tokens", 0)
+        stats["output_tokens"] += message.usage_metadata.get("output_tokens", 0)
+
+
+def estimate_tokens(text):
+    # Roughly four characters per token for English prose and URLs
+    return len(text) // 4 + 1
+
+
+def partition(records):
+    """Split records into consecutive batches whose findings fit the token budget."""
+    batches, batch, used = [], [], 0
+    for record in records:
+        cost = estimate_tokens(format_finding(record))
+        if batch and used + cost > token_budget:
+            batches.append(batch)
+            batch, used = [], 0
+        batch.append(record)
+        used += cost
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+async def rank_batch(batch, level, semaphore):
+    """Return the top-k records of a batch as ranked by the LLM."""
+    content = "\n\n".join(f"- ID: {record['id']}\n{format_finding(record)}" for record in batch)
+    async with semaphore:
+        result = await rank_chain.ainvoke({"content": content})
+    record_usage(level, result["raw"])
+    by_id = {record["id"]: record for record in batch}
+    ranked_ids = result["parsed"].ranked_ids if result["parsed"] else []
+    ranked = [by_id.pop(id) for id in ranked_ids if id in by_id]
+    # Anything the model dropped keeps its deterministic pre-rank order
+    ranked.extend(record for record in batch if record["id"] in by_id)
+    return ranked[:top_k]
+
+
+async def tournament(records):
+    """Reduce records level by level until the survivors fit in a single call."""
+    semaphore = asyncio.Semaphore(fan_out)
+    level = 1
+    batches = partition(records)
+    while len(batches) > 1:
+        print(f"=> Level {level}: ranking {len(records)} endpoints in {len(batches)} batches")
+        results = await asyncio.gather(*(rank_batch(batch, level, semaphore) for batch in batches))
+        survivors = [record for ranked in results for record in ranked]
+        if len(survivors) >= len(records):
+            # Batches too small to shrink further; keep the best that fit one call
+            survivors = partition(survivors)[0]
+        records = survivors
+        batches = partition(records)
+        level += 1
+    return records, level
+
+
+def report(records, level):
+    content = "\n\n".join(format_finding(record) for record in records)
+    final = None
+    for chunk in (prompt | llm).stream({"question": question.format(content=content)}):
+        print(chunk.content, end="", flush=True)
+        final = chunk if final is None else final + chunk
+    print()
+    record_usage(level, final)
+
+
+if not candidates:
+    print("No endpoints were flagged for possible injection")
+elif mode == "hierarchical":
+    finalists, final_level = asyncio.run(tournament(candidates))
+    print(f"=> Level {final_level}: final report on {len(finalists)} endpoints\n")
+    report(finalists, final_level)
+
+    print("\nCalls and tokens per level:")
+    for level, stats in sorted(usage.items()):
+        print(
+            f"- Level {level}: {stats['calls']} calls, "
+            f"{stats['input_tokens']} input tokens, {stats['output_tokens']} output tokens, "
+            f"{stats['cached']} answered from the response cache"
+        )
+else:
+    batches = [candidates[i : i + batch_size] for i in range(0, len(candidates), batch_size)]
+    for count, batch in enumerate(batches, start=1):
+        print(f"\n=> Batch {count}/{len(batches)}\n")
+        content = "\n\n".join(format_finding(record) for record in batch)
+        for chunk in chain.stream(question.format(content=content)):
+            print(chunk, end="", flush=True)
+        print()
 
 print("=" * 50)
@@ -1,11 +1,11 @@
 from langchain.agents import create_react_agent
-from langchain_aws import ChatBedrock
+from llm_factory import get_llm
 from langchain_core.prompts import PromptTemplate
 from langchain.agents import AgentExecutor
 from pydantic import BaseModel, Field
 from langchain.tools import BaseTool
 from langchain_community.vectorstores import FAISS
-from langchain_aws import BedrockEmbeddings
+from vector_store_registry import get_vector_store
 from typing import Optional, Type
 from langchain.callbacks.manager import CallbackManagerForToolRun
 from dotenv import load_dotenv
@@ -29,11 +29,7 @@ class CustomSearchTool(BaseTool):
     ) -> str:
         """Use the tool."""
         faiss_db_path = "../vector_databases/vtm_faiss"
-        db = FAISS.load_local(
-            faiss_db_path,
-            BedrockEmbeddings(model_id="amazon.titan-embed-text-v2:0"),
-            allow_dangerous_deserialization=True,
-        )
+        db = get_vector_store(faiss_db_path)
         return db.similarity_search(query)
 
     async def _arun(
@@ -44,10 +40,7 @@ class CustomSearchTool(BaseTool):
 
 # Define tools and LLM
 tools = [CustomSearchTool()]
-llm = ChatBedrock(
-    model_id="us.anthropic.claude-3-5-haiku-20241022-v1:0",
-    model_kwargs={"temperature": 0.6},
-)
+llm = get_llm(temperature=0.6)
 
 # Define instructions and prompt
 instructions = """
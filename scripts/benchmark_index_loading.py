@@ -0,0 +1,117 @@
+"""
+Benchmark cold-start time and memory of FAISS.load_local against the
+memory-mapped, read-only load_store path.
+
+The index_read and index_mmap modes load index.faiss alone, with
+faiss.read_index and with read_index's mmap path, which isolates what
+memory-mapping changes. The load_local and load_store modes load the whole
+store; unless it was converted with convert_docstore.py, the unpickled
+docstore dominates their memory and hides the difference.
+
+Each measurement runs in a fresh interpreter. Several processes of the same
+mode are started at once to show how much of the index they share: with
+mmap, USS (private memory) stays small while RSS counts shared pages.
+Memory is reported as growth over the interpreter after imports, right
+after loading (load USS) and after the first search has paged the
+vectors in (+RSS, +USS).
+
+Usage (from scripts/):
+    python benchmark_index_loading.py [processes]
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+STORES = ["../vector_databases/bridge_troll_faiss", "../vector_databases/vtm_faiss"]
+MODES = ["index_read", "index_mmap", "load_local", "load_store"]
+RUNS = 3
+
+
+def child(mode: str, path: str) -> None:
+    """Load one store, run one query and report timings and memory growth as JSON."""
+    import numpy as np
+    import psutil
+    from langchain_community.vectorstores import FAISS
+
+    import faiss
+
+    from vector_store_registry import load_store, read_index
+
+    # Imports are identical for every mode and excluded from the timing
+    baseline = psutil.Process().memory_full_info()
+    start = time.perf_counter()
+    if mode == "index_read":
+        index = faiss.read_index(os.path.join(path, "index.faiss"))
+    elif mode == "index_mmap":
+        index = read_index(path, mmap=True)
+    elif mode == "load_local":
+        # The embeddings client is never called, so none is created
+        index = FAISS.load_local(path, None, allow_dangerous_deserialization=True).index
+    else:
+        index = load_store(path, None).index
+    load_seconds = time.perf_counter() - start
+    # Before the search pages the mapped vectors in
+    loaded = psutil.Process().memory_full_info()
+
+    query = np.random.default_rng(0).random((1, index.d), dtype=np.float32)
+    start = time.perf_counter()
+    index.search(query, 4)
+    search_seconds = time.perf_counter() - start
+
+    memory = psutil.Process().memory_full_info()
+    print(
+        json.dumps(
+            {
+                "load_seconds": load_seconds,
+                "first_search_seconds": search_seconds,
+                "load_uss_mb": (loaded.uss - baseline.uss) / 2**20,
+                "rss_mb": (memory.rss - baseline.rss) / 2**20,
+                "uss_mb": (memory.uss - baseline.uss) / 2**20,
+            }
+        )
+    )
+
+
+def measure(mode: str, path: str, processes: int) -> list:
+    env = dict(os.environ, FAISS_MMAP="true" if mode in ("index_mmap", "load_store") else "false")
+    workers = [
+        subprocess.Popen(
+            [sys.executable, __file__, "--child", mode, path], stdout=subprocess.PIPE, text=True, env=env
+        )
+        for _ in range(processes)
+    ]
+    results = []
+    for worker in workers:
+        output, _ = worker.communicate()
+        if worker.returncode != 0:
+            raise RuntimeError(f"{mode} benchmark of {path} failed")
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    return results
+
+
+def report(processes: int) -> None:
+    print(f"{'store':<22}{'mode':<12}{'load ms':>9}{'search ms':>10}{'load USS':>9}{'+RSS MB':>9}{'+USS MB':>9}")
+    for path in STORES:
+        if not os.path.isfile(os.path.join(path, "index.faiss")):
+            print(f"Skipping {path}: no index.faiss")
+            continue
+        for mode in MODES:
+            results = [result for _ in range(RUNS) for result in measure(mode, path, processes)]
+            median = {key: statistics.median(r[key] for r in results) for key in results[0]}
+            print(
+                f"{os.path.basename(path):<22}{mode:<12}{median['load_seconds'] * 1000:>9.1f}"
+                f"{median['first_search_seconds'] * 1000:>10.2f}{median['load_uss_mb']:>9.1f}"
+                f"{median['rss_mb']:>9.1f}{median['uss_mb']:>9.1f}"
+            )
+    print(f"Medians of {RUNS} runs of {processes} concurrent process(es) each")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        child(sys.argv[2], sys.argv[3])
+    else:
+        report(int(sys.argv[1]) if len(sys.argv) > 1 else 4)
@@ -0,0 +1,64 @@
+"""
+Benchmark approximate index types against the flat index of each shipped
+vector database: recall@k, p50/p99 single-query latency and index size.
+
+Stored vectors are used as queries, so no embedding calls are made. The
+ground truth is the exact top-k from the flat index.
+
+Usage (from scripts/):
+    python benchmark_index_types.py [k] [queries]
+"""
+
+import os
+import sys
+import time
+
+import faiss
+import numpy as np
+
+from index_types import INDEX_TYPES, all_vectors, index_params, make_index
+
+VECTOR_DATABASES = "../vector_databases"
+
+
+def recall_at_k(exact, approximate, k: int) -> float:
+    hits = sum(len(set(e[:k]) & set(a[:k]) - {-1}) for e, a in zip(exact, approximate))
+    return hits / (len(exact) * k)
+
+
+def latencies_ms(index, queries, k: int) -> np.ndarray:
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query[None, :], k)
+        timings.append((time.perf_counter() - start) * 1000)
+    return np.array(timings)
+
+
+def benchmark(path: str, k: int, num_queries: int) -> None:
+    flat = faiss.read_index(os.path.join(path, "index.faiss"))
+    vectors = all_vectors(flat)
+    rows = np.random.default_rng(0).choice(len(vectors), min(num_queries, len(vectors)), replace=False)
+    queries = vectors[rows]
+    _, exact = flat.search(queries, k)
+    print(f"\n{os.path.basename(path)}: {flat.ntotal} vectors, d={flat.d}, {len(queries)} queries")
+    print(f"{'index':<10}{'built as':<10}{'recall@' + str(k):>10}{'p50 ms':>9}{'p99 ms':>9}{'size MB':>9}")
+    for index_type in INDEX_TYPES:
+        index, built_as, _ = make_index(vectors, flat.metric_type, index_type, index_params())
+        _, approximate = index.search(queries, k)
+        timings = latencies_ms(index, queries, k)
+        size_mb = len(faiss.serialize_index(index)) / 2**20
+        print(
+            f"{index_type:<10}{built_as:<10}{recall_at_k(exact, approximate, k):>10.3f}"
+            f"{np.percentile(timings, 50):>9.3f}{np.percentile(timings, 99):>9.3f}{size_mb:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    k = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    num_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    for name in sorted(os.listdir(VECTOR_DATABASES)):
+        path = os.path.join(VECTOR_DATABASES, name)
+        if not os.path.isfile(os.path.join(path, "index.faiss")):
+            continue
+        benchmark(path, k, num_queries)
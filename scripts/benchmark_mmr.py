@@ -0,0 +1,70 @@
+"""
+Micro-benchmark of the vectorized MMR selection against LangChain's
+maximal_marginal_relevance on the same candidate sets.
+
+Queries are random weighted mixes of two stored vectors, so no embedding
+calls are made. (A stored vector or an exact midpoint would make MMR scores
+tie exactly, and tie-breaking then depends on rounding.) Both
+implementations get identical candidates (fetch_k from adaptive_fetch_k)
+and the selections are checked for agreement.
+
+Usage (from scripts/):
+    python benchmark_mmr.py [queries]
+"""
+
+import os
+import sys
+import time
+
+import faiss
+import numpy as np
+from langchain_community.vectorstores.utils import maximal_marginal_relevance as langchain_mmr
+
+from index_types import all_vectors
+from mmr import adaptive_fetch_k, maximal_marginal_relevance
+
+STORES = ["../vector_databases/juice_shop.faiss", "../vector_databases/repo_scan_results_faiss"]
+K_VALUES = [20, 30, 100]
+
+
+def time_ms(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def benchmark(path: str, num_queries: int) -> None:
+    index = faiss.read_index(os.path.join(path, "index.faiss"))
+    vectors = all_vectors(index)
+    rng = np.random.default_rng(0)
+    first = rng.integers(0, len(vectors), size=num_queries)
+    second = (first + rng.integers(1, len(vectors), size=num_queries)) % len(vectors)
+    weights = rng.uniform(0.2, 0.8, size=(num_queries, 1)).astype(np.float32)
+    queries = weights * vectors[first] + (1 - weights) * vectors[second]
+    print(f"\n{os.path.basename(path)}: {index.ntotal} vectors, {len(queries)} queries")
+    print(f"{'k':>5}{'fetch_k':>9}{'langchain ms':>14}{'vectorized ms':>15}{'speedup':>9}{'agree':>7}")
+    for k in K_VALUES:
+        fetch_k = adaptive_fetch_k(k, index.ntotal)
+        langchain_total = vectorized_total = 0.0
+        agree = 0
+        for query in queries:
+            _, rows = index.search(query[None, :], fetch_k)
+            candidates = index.reconstruct_batch(rows[0])
+            expected, elapsed = time_ms(langchain_mmr, query, candidates, k=k, lambda_mult=0.5)
+            langchain_total += elapsed
+            chosen, elapsed = time_ms(maximal_marginal_relevance, query, candidates, k=k, lambda_mult=0.5)
+            vectorized_total += elapsed
+            agree += chosen == expected
+        print(
+            f"{k:>5}{fetch_k:>9}{langchain_total / len(queries):>14.2f}{vectorized_total / len(queries):>15.2f}"
+            f"{langchain_total / max(vectorized_total, 1e-9):>8.1f}x{agree / len(queries):>7.0%}"
+        )
+
+
+if __name__ == "__main__":
+    num_queries = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    for path in STORES:
+        if not os.path.isfile(os.path.join(path, "index.faiss")):
+            print(f"\nSkipping {path}: no index.faiss (rebuild it with its loader first)")
+            continue
+        benchmark(path, num_queries)
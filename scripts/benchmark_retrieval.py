@@ -0,0 +1,71 @@
+"""
+Retrieval-quality benchmark: vector-only MMR at k=100 (the old setting of
+sca_repo_analysis.py) against similarity, BM25 and hybrid retrieval at a
+small k.
+
+Each question names an exact identifier; a chunk is relevant when it
+contains one of the expected strings. Reported per method: recall (relevant
+chunks retrieved / min(relevant, k)), hit rate (questions with at least one
+relevant chunk) and the context size handed to the LLM, in ~tokens.
+
+Usage (from scripts/):
+    python benchmark_retrieval.py [k] [store paths...]
+"""
+
+import sys
+
+from hybrid_retriever import get_hybrid_retriever
+from lexical_index import store_texts
+
+STORES = ["../vector_databases/repo_scan_results_faiss", "../vector_databases/bridge_troll_faiss"]
+
+QUESTIONS = [
+    ("Where are raw SQL queries run with cursor.execute?", ["cursor.execute"]),
+    ("Which queries use .raw( and could be injectable?", [".raw("]),
+    ("Which views are protected with user_passes_test?", ["user_passes_test"]),
+    ("Where is find_by_sql used with interpolated input?", ["find_by_sql"]),
+    ("Which controllers call skip_before_action for authentication?", ["skip_before_action"]),
+    ("Where is html_safe or raw used in templates?", ["html_safe", "raw("]),
+    ("Where is protect_from_forgery configured?", ["protect_from_forgery"]),
+    ("Which code calls eval or instance_eval?", ["eval("]),
+]
+
+
+def estimate_tokens(docs) -> int:
+    return sum(len(doc.page_content) for doc in docs) // 4
+
+
+def evaluate(retriever, k: int) -> None:
+    db = retriever.store
+    texts = [text.lower() for text in store_texts(db)]
+    methods = {
+        "mmr k=100": lambda q: db.max_marginal_relevance_search(q, k=100, fetch_k=200),
+        f"similarity k={k}": lambda q: db.similarity_search(q, k=k),
+        f"bm25 k={k}": lambda q: [
+            db.docstore.search(db.index_to_docstore_id[row]) for row, _ in retriever.lexical.search(q, k)
+        ],
+        f"hybrid k={k}": retriever.invoke,
+    }
+    print(f"{'method':<16}{'recall':>8}{'hit rate':>10}{'tokens':>9}")
+    for name, search in methods.items():
+        recalls, hits, tokens = [], 0, 0
+        for question, expected in QUESTIONS:
+            relevant = sum(any(e.lower() in text for e in expected) for text in texts)
+            if not relevant:
+                continue
+            docs = search(question)
+            found = sum(any(e.lower() in doc.page_content.lower() for e in expected) for doc in docs)
+            recalls.append(found / min(relevant, len(docs) or 1))
+            hits += found > 0
+            tokens += estimate_tokens(docs)
+        if not recalls:
+            print("No question has a relevant chunk in this store")
+            return
+        print(f"{name:<16}{sum(recalls) / len(recalls):>8.2f}{hits / len(recalls):>10.2f}{tokens // len(recalls):>9}")
+
+
+if __name__ == "__main__":
+    k = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    for path in sys.argv[2:] or STORES:
+        print(f"\n{path}")
+        evaluate(get_hybrid_retriever(path, k=k, fetch_k=100), k)
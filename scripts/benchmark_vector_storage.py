@@ -0,0 +1,80 @@
+"""
+Compare reduced-precision and reduced-dimension storage against the current
+vector_databases/* builds: disk size, index load time and top-k agreement
+with the full float32, 1024-dimension index.
+
+Stored chunks are used as queries. Reduced-dimension variants re-embed every
+chunk at that size through the embedding cache, so the first run calls
+Bedrock once per chunk and dimension.
+
+Usage (from scripts/):
+    python benchmark_vector_storage.py [k] [queries]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import faiss
+import numpy as np
+from langchain_community.vectorstores import FAISS
+
+from embedding_cache import get_embeddings
+from index_types import all_vectors, index_params, make_index
+
+VECTOR_DATABASES = "../vector_databases"
+# (encoding, dimensions); None keeps the stored dimension
+VARIANTS = [
+    ("float32", None),
+    ("fp16", None),
+    ("int8", None),
+    ("float32", 512),
+    ("float32", 256),
+    ("int8", 256),
+]
+
+
+def load_seconds(index, runs: int = 5) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = os.path.join(tmp, "index.faiss")
+        faiss.write_index(index, file_path)
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            faiss.read_index(file_path)
+            timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def benchmark(path: str, k: int, num_queries: int) -> None:
+    db = FAISS.load_local(path, None, allow_dangerous_deserialization=True)
+    vectors = all_vectors(db.index)
+    texts = [db.docstore.search(db.index_to_docstore_id[row]).page_content for row in range(db.index.ntotal)]
+    rows = np.random.default_rng(0).choice(len(vectors), min(num_queries, len(vectors)), replace=False)
+    _, baseline = db.index.search(vectors[rows], k)
+
+    print(f"\n{os.path.basename(path)}: {db.index.ntotal} vectors, d={db.index.d}, {len(rows)} queries")
+    print(f"{'encoding':<10}{'dims':>6}{'size MB':>9}{'load ms':>9}{'agree@' + str(k):>10}")
+    for encoding, dimensions in VARIANTS:
+        variant_vectors = vectors
+        if dimensions and dimensions != db.index.d:
+            embedded = get_embeddings(dimensions=dimensions).embed_documents(texts)
+            variant_vectors = np.array(embedded, dtype=np.float32)
+        index, _, _ = make_index(variant_vectors, db.index.metric_type, "flat", index_params(encoding=encoding))
+        _, found = index.search(variant_vectors[rows], k)
+        agreement = np.mean([len(set(a) & set(b)) / k for a, b in zip(baseline, found)])
+        print(
+            f"{encoding:<10}{index.d:>6}{len(faiss.serialize_index(index)) / 2**20:>9.2f}"
+            f"{load_seconds(index) * 1000:>9.2f}{agreement:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    k = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    num_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    for name in sorted(os.listdir(VECTOR_DATABASES)):
+        path = os.path.join(VECTOR_DATABASES, name)
+        if not (os.path.isfile(os.path.join(path, "index.faiss")) and os.path.isfile(os.path.join(path, "index.pkl"))):
+            continue
+        benchmark(path, k, num_queries)
@@ -0,0 +1,69 @@
+"""
+Streaming reader for Burp Suite session exports.
+
+Items are parsed one at a time with iterparse and cleared as soon as they
+have been yielded, and base64 request/response bodies are only decoded
+when accessed, so memory stays flat regardless of the export size.
+"""
+
+import base64
+import xml.etree.ElementTree as ET
+from typing import Iterator, Optional
+
+
+def _decode(text: Optional[str], is_base64: bool) -> str:
+    if not text:
+        return ""
+    if is_base64:
+        return base64.b64decode(text).decode("utf-8", errors="replace")
+    return text
+
+
+class SessionItem:
+    """A single request/response pair from a Burp export."""
+
+    __slots__ = (
+        "id", "url", "host", "port", "protocol", "method", "path",
+        "status", "mimetype", "_request", "_request_b64", "_response", "_response_b64",
+    )
+
+    def __init__(self, id: int, elem: ET.Element):
+        self.id = id
+        self.url = elem.findtext("url")
+        self.host = elem.findtext("host")
+        self.port = elem.findtext("port")
+        self.protocol = elem.findtext("protocol")
+        self.method = elem.findtext("method")
+        self.path = elem.findtext("path")
+        self.status = elem.findtext("status")
+        self.mimetype = elem.findtext("mimetype")
+        request = elem.find("request")
+        self._request = request.text if request is not None else None
+        self._request_b64 = request is not None and request.get("base64") == "true"
+        response = elem.find("response")
+        self._response = response.text if response is not None else None
+        self._response_b64 = response is not None and response.get("base64") == "true"
+
+    @property
+    def request(self) -> str:
+        """The decoded raw HTTP request."""
+        return _decode(self._request, self._request_b64)
+
+    @property
+    def response(self) -> str:
+        """The decoded raw HTTP response."""
+        return _decode(self._response, self._response_b64)
+
+
+def iter_session(xml_file: str) -> Iterator[SessionItem]:
+    """Yield the items of a Burp session export one at a time, numbered from 1."""
+    context = ET.iterparse(xml_file, events=("start", "end"))
+    _, root = next(context)
+    count = 1
+    for event, elem in context:
+        if event == "end" and elem.tag == "item":
+            yield SessionItem(count, elem)
+            count += 1
+            # Drop the processed item so the tree never grows
+            elem.clear()
+            root.clear()
@@ -0,0 +1,27 @@
+import os
+import pytest
+from burp_session import iter_session
+
+xml_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "vtm-session.xml")
+
+
+@pytest.mark.unit
+def test_iter_session_yields_every_item():
+    """
+    Test that every item in the export is yielded in order.
+    """
+    items = list(iter_session(xml_file))
+    assert len(items) == 53
+    assert [item.id for item in items] == list(range(1, 54))
+    assert items[0].url == "https://vtm.rdpt.dev/"
+    assert items[0].method == "GET"
+
+
+@pytest.mark.unit
+def test_iter_session_decodes_lazily():
+    """
+    Test that base64 bodies are decoded on access.
+    """
+    item = next(iter_session(xml_file))
+    assert item.request.startswith("GET / HTTP/1.1")
+    assert item.response.startswith("HTTP/")
@@ -1,6 +1,6 @@
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnableMap, RunnableSequence, RunnablePassthrough
-from langchain_aws import ChatBedrock
+from llm_factory import get_llm
 from langchain_core.output_parsers import StrOutputParser
 
 # Load Env Variables
@@ -9,10 +9,7 @@ load_dotenv()
 
 
 # Define the LLM
-llm = ChatBedrock(
-    model_id="us.us.anthropic.claude-3-5-haiku-20241022-v1:0",
-    model_kwargs={"temperature": 0.5},
-)
+llm = get_llm(temperature=0.5)
 
 # Define the first question prompt
 first_prompt = ChatPromptTemplate.from_messages(
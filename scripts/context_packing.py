@@ -0,0 +1,160 @@
+"""
+Token-budgeted packing of small source files into shared LLM calls.
+
+Most files in a Django repo (__init__.py, migrations, small forms) are a few
+hundred tokens, so with one call per file the system prompt and few-shot
+examples dominate the input. Files are instead grouped, in order, into
+batches whose code fits a token budget. Each file is wrapped in a delimiter
+naming its path, the model is asked to answer per file under a matching
+header (a one-line "No findings." for files with nothing to report, which
+keeps questions like "don't mention safe code" from dropping them), and the
+answer is split back into per-file results. Files the answer does not cover
+are returned as missing so callers can analyze them alone.
+
+Single-file batches are sent exactly as in per-file mode, so their prompts
+(and LLM cache entries) are unchanged.
+"""
+
+import os
+import re
+import threading
+from typing import Any, Dict, List, Tuple
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from llm_factory import estimate_tokens
+
+# Code tokens per packed call; 0 analyzes one file per call
+DEFAULT_TOKEN_BUDGET = int(os.getenv("PACK_TOKEN_BUDGET", "6000"))
+
+FILE_HEADER = "=== FILE: {path} ==="
+FILE_HEADER_PATTERN = re.compile(r"^[#*`\s]*=== FILE: (.+?) ===[*`\s]*$", re.MULTILINE)
+
+PACKED_INSTRUCTIONS = """
+The context contains {count} files, each between <file path="..."> and </file> tags.
+Answer the question for every file separately. Start the answer for each file
+with a line containing only: === FILE: <path> ===
+Every file needs its header, including files with nothing to report: for those,
+write the single line "No findings." under the header. This overrides any request
+above not to mention such code.
+"""
+
+
+def wrap_file(path: str, code: str) -> str:
+    return f'<file path="{path}">\n{code}\n</file>'
+
+
+def pack_files(files: Dict[str, str], budget: int = DEFAULT_TOKEN_BUDGET) -> List[List[str]]:
+    """
+    Group file paths, in order, into batches whose wrapped code fits budget
+    tokens. A file larger than the budget gets a batch of its own.
+    """
+    if budget <= 0:
+        return [[path] for path in files]
+    batches, batch, used = [], [], 0
+    for path, code in files.items():
+        tokens = estimate_tokens(wrap_file(path, code))
+        if batch and used + tokens > budget:
+            batches.append(batch)
+            batch, used = [], 0
+        batch.append(path)
+        used += tokens
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def batch_input(paths: List[str], files: Dict[str, str], question: str) -> dict:
+    """Chain input for a batch: the bare file for a single path, delimited files otherwise."""
+    if len(paths) == 1:
+        return {"context": files[paths[0]], "question": question}
+    context = "\n\n".join(wrap_file(path, files[path]) for path in paths)
+    return {"context": context, "question": question + PACKED_INSTRUCTIONS.format(count=len(paths))}
+
+
+def split_response(paths: List[str], response: str) -> Tuple[Dict[str, str], List[str]]:
+    """
+    Split a batch answer into {path: answer} by its file headers. Returns the
+    results and the paths the answer did not cover.
+    """
+    if len(paths) == 1:
+        return {paths[0]: response}, []
+    results = {}
+    matches = [match for match in FILE_HEADER_PATTERN.finditer(response) if match.group(1).strip() in paths]
+    for match, following in zip(matches, matches[1:] + [None]):
+        end = following.start() if following else len(response)
+        path = match.group(1).strip()
+        results[path] = (results.get(path, "") + response[match.end() : end]).strip()
+    return results, [path for path in paths if path not in results]
+
+
+def estimate_per_file_tokens(files: Dict[str, str], prompt_tokens: int) -> int:
+    """Estimated input tokens of analyzing every file in a call of its own."""
+    return sum(prompt_tokens + estimate_tokens(code) for code in files.values())
+
+
+def packing_report(batches: List[List[str]], files: Dict[str, str], prompt_tokens: int) -> str:
+    """
+    Calls and estimated input tokens of the packed batches versus one call per
+    file, where prompt_tokens is the prompt overhead paid by every call.
+    """
+    per_file_calls = len(files)
+    per_file_tokens = estimate_per_file_tokens(files, prompt_tokens)
+    packed_tokens = sum(
+        prompt_tokens + estimate_tokens(batch_input(batch, files, "")["context"]) for batch in batches
+    )
+    saved_calls = per_file_calls - len(batches)
+    saved_tokens = per_file_tokens - packed_tokens
+    return (
+        f"Packed {per_file_calls} files into {len(batches)} calls: saves {saved_calls} calls "
+        f"({saved_calls / max(per_file_calls, 1):.0%}) and ~{saved_tokens} input tokens "
+        f"({saved_tokens / max(per_file_tokens, 1):.0%}) versus one call per file"
+    )
+
+
+class CallUsage(BaseCallbackHandler):
+    """
+    Callback counting the chat model calls a run actually made, retries and
+    re-analyzed files included, and the input tokens the model reported.
+    Calls answered from the response cache are counted apart, without tokens.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.failed = 0
+        self.cached = 0
+        self.input_tokens = 0
+        self._lock = threading.Lock()
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[list], **kwargs) -> None:
+        with self._lock:
+            self.calls += 1
+
+    def on_llm_end(self, response: LLMResult, **kwargs) -> None:
+        tokens, cached = 0, 0
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                if message is not None and message.response_metadata.get("cached"):
+                    # Replayed from the response cache with the original call's usage
+                    cached += 1
+                    continue
+                tokens += (getattr(message, "usage_metadata", None) or {}).get("input_tokens", 0)
+        with self._lock:
+            self.cached += cached
+            self.input_tokens += tokens
+
+    def on_llm_error(self, error: BaseException, **kwargs) -> None:
+        with self._lock:
+            self.failed += 1
+
+
+def usage_report(usage: CallUsage, files: Dict[str, str], prompt_tokens: int) -> str:
+    """The calls and input tokens a run used versus the estimate for one call per file."""
+    estimate = estimate_per_file_tokens(files, prompt_tokens)
+    return (
+        f"Made {usage.calls} calls ({usage.failed} failed, {usage.cached} cached) "
+        f"using {usage.input_tokens} input tokens, "
+        f"versus {len(files)} calls and ~{estimate} input tokens estimated for one call per file"
+    )
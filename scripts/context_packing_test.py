@@ -0,0 +1,91 @@
+import pytest
+from context_packing import CallUsage, batch_input, pack_files, packing_report, split_response, usage_report
+from langchain_core.language_models.fake_chat_models import (
+    FakeListChatModel,
+    FakeListChatModelError,
+    FakeMessagesListChatModel,
+)
+from langchain_core.messages import AIMessage
+
+files = {
+    "repo/app/__init__.py": "",
+    "repo/app/forms.py": "x" * 400,
+    "repo/app/views.py": "y" * 4000,
+    "repo/app/models.py": "z" * 400,
+}
+
+
+@pytest.mark.unit
+def test_files_are_packed_in_order_under_the_budget():
+    """
+    Test that batches keep file order, respect the budget and give oversized files their own call.
+    """
+    assert pack_files(files, budget=300) == [
+        ["repo/app/__init__.py", "repo/app/forms.py"],
+        ["repo/app/views.py"],
+        ["repo/app/models.py"],
+    ]
+    assert pack_files(files, budget=0) == [[path] for path in files]
+
+
+@pytest.mark.unit
+def test_single_file_batches_match_per_file_prompts():
+    """
+    Test that a one-file batch sends the bare file and question, as in per-file mode.
+    """
+    assert batch_input(["repo/app/forms.py"], files, "Any flaws?") == {"context": "x" * 400, "question": "Any flaws?"}
+    packed = batch_input(["repo/app/__init__.py", "repo/app/forms.py"], files, "Any flaws?")
+    assert '<file path="repo/app/forms.py">' in packed["context"]
+    assert "=== FILE: <path> ===" in packed["question"]
+    assert '"No findings."' in packed["question"]
+
+
+@pytest.mark.unit
+def test_answers_split_back_per_file():
+    """
+    Test that the answer is split on file headers and uncovered files are reported missing.
+    """
+    paths = ["repo/app/__init__.py", "repo/app/forms.py", "repo/app/models.py"]
+    response = (
+        "Here is the analysis.\n"
+        "=== FILE: repo/app/forms.py ===\nNo issues.\n\n"
+        "**=== FILE: repo/app/__init__.py ===**\nEmpty module.\n"
+    )
+    results, missing = split_response(paths, response)
+    assert results == {"repo/app/forms.py": "No issues.", "repo/app/__init__.py": "Empty module."}
+    assert missing == ["repo/app/models.py"]
+    assert split_response(["repo/app/views.py"], "All good") == ({"repo/app/views.py": "All good"}, [])
+
+
+@pytest.mark.unit
+def test_report_counts_saved_calls_and_tokens():
+    """
+    Test that the report compares packed calls and prompt overhead with per-file mode.
+    """
+    report = packing_report(pack_files(files, budget=300), files, prompt_tokens=1000)
+    assert report.startswith("Packed 4 files into 3 calls: saves 1 calls (25%)")
+    # One prompt overhead saved, less the delimiters around the packed files
+    saved_tokens = int(report.split("~")[1].split()[0])
+    assert 950 < saved_tokens < 1000
+
+
+@pytest.mark.unit
+def test_usage_counts_every_call_and_reported_input_tokens():
+    """
+    Test that the run report counts failed and repeated calls and the model's input tokens.
+    """
+    usage_metadata = {"input_tokens": 120, "output_tokens": 5, "total_tokens": 125}
+    llm = FakeMessagesListChatModel(responses=[AIMessage("ok", usage_metadata=usage_metadata)] * 2)
+    usage = CallUsage()
+    llm.invoke("first", config={"callbacks": [usage]})
+    llm.invoke("again", config={"callbacks": [usage]})
+    failing = FakeListChatModel(responses=["unused"], error_on_chunk_number=0)
+    with pytest.raises(FakeListChatModelError):
+        list(failing.stream("x", config={"callbacks": [usage]}))
+    replayed = FakeMessagesListChatModel(
+        responses=[AIMessage("ok", usage_metadata=usage_metadata, response_metadata={"cached": True})]
+    )
+    replayed.invoke("first", config={"callbacks": [usage]})
+    assert (usage.calls, usage.failed, usage.cached, usage.input_tokens) == (4, 1, 1, 240)
+    report = usage_report(usage, files, prompt_tokens=1000)
+    assert report.startswith("Made 4 calls (1 failed, 1 cached) using 240 input tokens")
@@ -0,0 +1,44 @@
+"""
+Convert saved vector databases to the pickle-free, memory-mapped docstore.
+
+Usage (from scripts/):
+    python convert_docstore.py                      # every store in ../vector_databases
+    python convert_docstore.py ../vector_databases/vtm_faiss
+
+index.faiss and index.pkl are left untouched; later loads through
+vector_store_registry open the documents memory-mapped instead of unpickling.
+Re-run after rebuilding a store.
+"""
+
+import os
+import sys
+import time
+
+from langchain_community.vectorstores import FAISS
+
+from embedding_cache import get_embeddings
+from mmap_docstore import convert_store
+
+VECTOR_DATABASES = "../vector_databases"
+
+
+def store_paths(args):
+    if args:
+        return args
+    return sorted(
+        os.path.join(VECTOR_DATABASES, name)
+        for name in os.listdir(VECTOR_DATABASES)
+        if os.path.isdir(os.path.join(VECTOR_DATABASES, name))
+    )
+
+
+if __name__ == "__main__":
+    embeddings = get_embeddings()
+    for path in store_paths(sys.argv[1:]):
+        if not (os.path.isfile(os.path.join(path, "index.faiss")) and os.path.isfile(os.path.join(path, "index.pkl"))):
+            print(f"Skipping {path}: no index.faiss/index.pkl pair")
+            continue
+        start = time.perf_counter()
+        db = FAISS.load_local(path, embeddings, allow_dangerous_deserialization=True)
+        count = convert_store(db, path)
+        print(f"Converted {path}: {count} documents in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,93 @@
+"""
+Structured per-endpoint findings handed from the investigate stage to the
+prioritize stage as JSONL.
+
+Each line is one request: id, url, method, parameters, possible_injection
+and justification. Reports in the older free-text format, such as the
+shipped data/dynamic_analysis_output.txt, can be read as the same records.
+"""
+
+import json
+import re
+from typing import Iterator, List
+
+from pydantic import BaseModel, Field
+
+# Methods that usually change server-side state rank above read-only ones
+METHOD_WEIGHTS = {"POST": 3, "PUT": 3, "PATCH": 3, "DELETE": 2, "GET": 1}
+
+
+class InjectionVerdict(BaseModel):
+    parameters: List[str] = Field(description="names of the user-controllable parameters of the request")
+    possible_injection: bool = Field(description="whether an injection exploit may be possible")
+    justification: str = Field(description="a brief justification, empty if injection is not possible")
+
+
+def finding(item, verdict: InjectionVerdict) -> dict:
+    """Build the JSONL record for a session item and its verdict."""
+    return {
+        "id": item.id,
+        "url": item.url,
+        "method": item.method,
+        "parameters": verdict.parameters,
+        "possible_injection": verdict.possible_injection,
+        "justification": verdict.justification,
+    }
+
+
+def read_findings(path: str) -> Iterator[dict]:
+    """Stream the records of a findings file, skipping repeated ids and truncated lines."""
+    seen = set()
+    with open(path, "r") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("id") in seen:
+                continue
+            seen.add(record.get("id"))
+            yield record
+
+
+def read_text_findings(path: str) -> Iterator[dict]:
+    """
+    Stream records from a free-text report of "Request <url>:" blocks with
+    "- Field: value" bullets. Blocks are numbered as ids in file order.
+    """
+    with open(path, "r") as f:
+        blocks = re.split(r"\n\s*\n(?=Request )", f.read())
+    for number, block in enumerate(blocks, start=1):
+        fields = dict(re.findall(r"^- ([^:]+): ?(.*)$", block, re.MULTILINE))
+        if "URL" not in fields:
+            continue
+        parameters = fields.get("Parameters", "None").strip()
+        yield {
+            "id": number,
+            "url": fields["URL"].strip(),
+            "method": fields.get("HTTP Method", "GET").strip().upper(),
+            "parameters": [] if parameters == "None" else [
+                name.split("=")[0].strip() for name in re.split(r"[,&]", parameters) if name.strip()
+            ],
+            "possible_injection": fields.get("Possible Injection", "").strip().lower().startswith("yes"),
+            "justification": fields.get("Justification", "").strip(),
+        }
+
+
+def priority_score(record: dict) -> tuple:
+    """Deterministic pre-rank: flagged first, then by parameter count and method."""
+    return (
+        record["possible_injection"],
+        len(record["parameters"]),
+        METHOD_WEIGHTS.get(record["method"], 1),
+    )
+
+
+def format_finding(record: dict) -> str:
+    return (
+        f"- URL: {record['url']}\n"
+        f"- HTTP Method: {record['method']}\n"
+        f"- Parameters: {', '.join(record['parameters']) or 'None'}\n"
+        f"- Possible Injection: {'Yes' if record['possible_injection'] else 'No'}\n"
+        f"- Justification: {record['justification']}"
+    )
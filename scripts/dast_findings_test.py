@@ -0,0 +1,37 @@
+import pytest
+from dast_findings import read_text_findings
+
+report = """Request https://vtm.rdpt.dev/:
+- URL: http://vtm.rdpt.dev/
+- HTTP Method: GET
+- Parameters: None
+- Possible Injection: No
+- Justification: No user-controllable parameters present in the request.
+
+Request https://vtm.rdpt.dev/taskManager/login/:
+- URL: https://vtm.rdpt.dev/taskManager/login/
+- HTTP Method: POST
+- Parameters: username=chris&password=test123
+- Possible Injection: Yes
+- Justification: Credentials are passed to the login query.
+"""
+
+
+@pytest.mark.unit
+def test_text_report_reads_as_findings(tmp_path):
+    """
+    Test that the free-text report shipped in data/ parses into JSONL-style records.
+    """
+    path = tmp_path / "dynamic_analysis_output.txt"
+    path.write_text(report)
+    records = list(read_text_findings(str(path)))
+    assert [record["id"] for record in records] == [1, 2]
+    assert records[0]["parameters"] == [] and not records[0]["possible_injection"]
+    assert records[1] == {
+        "id": 2,
+        "url": "https://vtm.rdpt.dev/taskManager/login/",
+        "method": "POST",
+        "parameters": ["username", "password"],
+        "possible_injection": True,
+        "justification": "Credentials are passed to the login query.",
+    }
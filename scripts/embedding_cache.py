@@ -0,0 +1,144 @@
+"""
+Disk-backed embedding cache shared by every vector database build.
+
+Vectors are stored in SQLite keyed by the embedding model id plus a hash of
+the chunk text, so identical chunks are only ever embedded once no matter
+which database they end up in.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from array import array
+from typing import List, Optional
+
+from langchain_aws import BedrockEmbeddings
+from langchain_core.embeddings import Embeddings
+
+DEFAULT_MODEL_ID = "amazon.titan-embed-text-v2:0"
+# Output size of each model; Titan v2 can also embed at a reduced dimension
+NATIVE_DIMENSIONS = {"amazon.titan-embed-text-v2:0": 1024, "amazon.titan-embed-text-v1": 1536}
+# Titan v2 also supports 512 and 256; unset keeps the native size
+DEFAULT_DIMENSIONS = int(os.getenv("EMBEDDING_DIMENSIONS", "0")) or None
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "vector_databases", "embedding_cache.sqlite"
+)
+# ~4 KB per 1024-dimension vector, so the default bound is roughly 400 MB
+DEFAULT_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "100000"))
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that reads from an SQLite cache before calling the backend."""
+
+    def __init__(
+        self,
+        underlying: Embeddings,
+        model_id: str,
+        path: str = DEFAULT_CACHE_PATH,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        dimensions: Optional[int] = None,
+    ):
+        self.underlying = underlying
+        self.model_id = model_id
+        self.dimensions = dimensions
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                vector BLOB NOT NULL,
+                last_used INTEGER NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+        self._conn.commit()
+
+    def _key(self, text: str) -> str:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        if self.dimensions:
+            return f"{self.model_id}@{self.dimensions}:{digest}"
+        return f"{self.model_id}:{digest}"
+
+    def _lookup(self, keys: List[str]) -> dict:
+        found = {}
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                batch = keys[start : start + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})",
+                    batch,
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+            if found:
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = strftime('%s','now') WHERE key = ?",
+                    [(key,) for key in found],
+                )
+                self._conn.commit()
+        return found
+
+    def _store(self, items: dict) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, strftime('%s','now'))",
+                [(key, array("f", vector).tobytes()) for key, vector in items.items()],
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE key IN "
+                "(SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._key(text) for text in texts]
+        cached = self._lookup(list(set(keys)))
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached:
+                missing.setdefault(key, text)
+
+        with self._lock:
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            vectors = self.underlying.embed_documents(list(missing.values()))
+            fresh = dict(zip(missing.keys(), vectors))
+            self._store(fresh)
+            cached.update(fresh)
+        return [cached[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        # Titan embeds queries and documents identically, so both share one cache
+        return self.embed_documents([text])[0]
+
+    def report(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        return f"Embedding cache: {self.hits} hits, {self.misses} misses ({rate:.0%} hit rate)"
+
+
+def get_embeddings(model_id: str = DEFAULT_MODEL_ID, dimensions: Optional[int] = None, **kwargs) -> CachedEmbeddings:
+    """
+    Return Bedrock embeddings for model_id wrapped in the shared on-disk cache.
+    dimensions (default EMBEDDING_DIMENSIONS) asks the model for smaller vectors.
+    """
+    dimensions = dimensions or DEFAULT_DIMENSIONS
+    if not dimensions or dimensions == NATIVE_DIMENSIONS.get(model_id):
+        return CachedEmbeddings(BedrockEmbeddings(model_id=model_id), model_id, **kwargs)
+    underlying = BedrockEmbeddings(model_id=model_id, model_kwargs={"dimensions": dimensions})
+    return CachedEmbeddings(underlying, model_id, dimensions=dimensions, **kwargs)
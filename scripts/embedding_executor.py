@@ -0,0 +1,161 @@
+"""
+Batched, concurrent embedding for FAISS index builds.
+
+Chunks are embedded in batches by a thread pool whose effective concurrency
+shrinks when Bedrock throttles and grows back as requests succeed. Finished
+batches are streamed into the index as they complete instead of waiting for
+the whole corpus to be embedded.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Optional
+
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+from retry_policy import FATAL, THROTTLING, backoff_delay, classify_error
+
+DEFAULT_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "16"))
+DEFAULT_MAX_WORKERS = int(os.getenv("EMBEDDING_WORKERS", "8"))
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit that halves on throttling and recovers by one slot
+    after a run of successful requests (additive increase, multiplicative decrease).
+    """
+
+    def __init__(self, max_limit: int, recovery: int = 4):
+        self.max_limit = max_limit
+        self.limit = max_limit
+        self.recovery = recovery
+        self._in_flight = 0
+        self._successes = 0
+        self._cond = threading.Condition()
+
+    def __enter__(self):
+        with self._cond:
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._in_flight += 1
+        return self
+
+    def __exit__(self, *exc):
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def success(self) -> None:
+        with self._cond:
+            self._successes += 1
+            if self._successes >= self.recovery and self.limit < self.max_limit:
+                self.limit += 1
+                self._successes = 0
+                self._cond.notify_all()
+
+    def throttled(self) -> None:
+        with self._cond:
+            self.limit = max(1, self.limit // 2)
+            self._successes = 0
+
+
+class EmbeddingExecutor:
+    """Embeds documents with bounded concurrency and adaptive backoff."""
+
+    def __init__(
+        self,
+        embeddings,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        max_retries: int = 8,
+        verbose: bool = True,
+    ):
+        self.embeddings = embeddings
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        # Progress and throughput lines; off for callers that add one small batch at a time
+        self.verbose = verbose
+        self.limiter = AdaptiveLimiter(max_workers)
+        self.retries = 0
+        self.throttles = 0
+        self._stats_lock = threading.Lock()
+
+    def _embed_batch(self, batch: List[Document]) -> List[List[float]]:
+        texts = [doc.page_content for doc in batch]
+        for attempt in range(self.max_retries + 1):
+            with self.limiter:
+                try:
+                    vectors = self.embeddings.embed_documents(texts)
+                    self.limiter.success()
+                    return vectors
+                except Exception as e:
+                    kind = classify_error(e)
+                    if kind == FATAL or attempt == self.max_retries:
+                        raise
+                    if kind == THROTTLING:
+                        self.limiter.throttled()
+            with self._stats_lock:
+                self.retries += 1
+                if kind == THROTTLING:
+                    self.throttles += 1
+            # Sleep outside the limiter so the slot is free for other batches
+            time.sleep(backoff_delay(attempt))
+
+    def build(
+        self,
+        texts: List[Document],
+        db: Optional[FAISS] = None,
+        ids: Optional[List[str]] = None,
+    ) -> Optional[FAISS]:
+        """
+        Embed texts and add them to db, creating a new store if db is None.
+        Returns the store, or db unchanged when there is nothing to embed.
+        """
+        if not texts:
+            return db
+        ids = ids or [None] * len(texts)
+        batches = [
+            (texts[i : i + self.batch_size], ids[i : i + self.batch_size])
+            for i in range(0, len(texts), self.batch_size)
+        ]
+
+        start = time.monotonic()
+        done = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self._embed_batch, batch): (batch, batch_ids) for batch, batch_ids in batches}
+            for future in as_completed(futures):
+                batch, batch_ids = futures[future]
+                text_embeddings = list(zip([doc.page_content for doc in batch], future.result()))
+                metadatas = [doc.metadata for doc in batch]
+                batch_ids = batch_ids if all(batch_ids) else None
+                if db is None:
+                    db = FAISS.from_embeddings(text_embeddings, self.embeddings, metadatas=metadatas, ids=batch_ids)
+                else:
+                    db.add_embeddings(text_embeddings, metadatas=metadatas, ids=batch_ids)
+                done += len(batch)
+                if self.verbose:
+                    print(f"=> Embedded {done}/{len(texts)} chunks", end="\r", flush=True)
+
+        if self.verbose:
+            elapsed = time.monotonic() - start
+            print(
+                f"\nEmbedded {len(texts)} chunks in {elapsed:.1f}s "
+                f"({len(texts) / max(elapsed, 1e-9):.1f} chunks/sec, "
+                f"{self.retries} retries, {self.throttles} throttled)"
+            )
+        return db
+
+
+def build_index(
+    texts: List[Document],
+    embeddings,
+    db: Optional[FAISS] = None,
+    ids: Optional[List[str]] = None,
+    **kwargs,
+) -> Optional[FAISS]:
+    """Convenience wrapper: embed texts concurrently into db (or a new store)."""
+    return EmbeddingExecutor(embeddings, **kwargs).build(texts, db=db, ids=ids)
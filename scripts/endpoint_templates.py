@@ -0,0 +1,42 @@
+"""
+Group HTTP requests into endpoint templates.
+
+Requests are keyed by method, host, path with numeric, UUID and long hex
+segments collapsed, and the set of parameter names, so repeated crawls of
+the same endpoint only need to be analyzed once.
+"""
+
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+from urllib.parse import urlsplit
+
+import http_params
+
+
+def normalize_path(path: str) -> str:
+    """Collapse variable path segments, e.g. /task/12/edit -> /task/{int}/edit."""
+    segments = []
+    for segment in urlsplit(path).path.split("/"):
+        kind = http_params.segment_kind(segment)
+        segments.append(f"{{{kind}}}" if kind else segment)
+    return "/".join(segments)
+
+
+def parameter_names(request: str) -> FrozenSet[str]:
+    """Location-qualified names of the non-cookie parameters of a raw request."""
+    return frozenset(http_params.parameter_names(http_params.parse_request(request)))
+
+
+def endpoint_key(method: str, url: str, request: str) -> Tuple[str, str, str, FrozenSet[str]]:
+    parts = urlsplit(url)
+    return (method.upper(), parts.netloc.lower(), normalize_path(parts.path), parameter_names(request))
+
+
+def endpoint_groups(items: Iterable) -> Dict[tuple, List[int]]:
+    """
+    Group items (anything with id, method, url and request attributes) by
+    endpoint template. Returns template -> item ids, in first-seen order.
+    """
+    groups: Dict[tuple, List[int]] = {}
+    for item in items:
+        groups.setdefault(endpoint_key(item.method, item.url, item.request), []).append(item.id)
+    return groups
@@ -0,0 +1,31 @@
+from collections import namedtuple
+import pytest
+from endpoint_templates import endpoint_groups, normalize_path
+
+Item = namedtuple("Item", ["id", "method", "url", "request"])
+
+
+@pytest.mark.unit
+def test_normalize_path_collapses_variable_segments():
+    """
+    Test that numeric, UUID and long hex segments are collapsed.
+    """
+    assert normalize_path("/taskManager/12/edit/") == "/taskManager/{int}/edit/"
+    assert normalize_path("/file/3f2504e0-4f89-11d3-9a0c-0305e82c3301") == "/file/{uuid}"
+    assert normalize_path("/avatar/d41d8cd98f00b204e9800998ecf8427e?s=1") == "/avatar/{hex}"
+    assert normalize_path("/static/v2/app.js") == "/static/v2/app.js"
+
+
+@pytest.mark.unit
+def test_endpoint_groups_splits_on_parameter_names():
+    """
+    Test that requests only share a group when method, template and parameter names match.
+    """
+    items = [
+        Item(1, "GET", "https://app/task/1/?q=a", "GET /task/1/?q=a HTTP/1.1\r\n\r\n"),
+        Item(2, "GET", "https://app/task/2/?q=b", "GET /task/2/?q=b HTTP/1.1\r\n\r\n"),
+        Item(3, "GET", "https://app/task/3/?page=2", "GET /task/3/?page=2 HTTP/1.1\r\n\r\n"),
+        Item(4, "POST", "https://app/task/4/", "POST /task/4/ HTTP/1.1\r\n"
+             "Content-Type: application/x-www-form-urlencoded\r\n\r\nq=c"),
+    ]
+    assert list(endpoint_groups(items).values()) == [[1, 2], [3], [4]]
@@ -0,0 +1,81 @@
+"""
+Federated search across several vector databases.
+
+Cross-source questions (guide policy vs. application code vs. session
+traffic) used to load and search each store in turn. Here the query is
+embedded once, every selected store is searched in its own thread, and the
+hits are merged on one scale: raw FAISS distances are not comparable between
+stores (L2 vs. inner product, flat vs. quantized), so each hit is rescored as
+the cosine similarity between the query and its stored vector.
+
+Stores built with different embedding models or dimensions live in
+different vector spaces and are refused rather than mixed.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Sequence
+
+import numpy as np
+from langchain_community.vectorstores import FAISS
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from metadata_index import search_rows
+from store_catalog import resolve
+from vector_store_registry import get_vector_store
+
+
+def cosine_scores(query: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+    """Cosine similarity of each row of vectors (n x d) to query (d)."""
+    norms = np.linalg.norm(vectors, axis=1) * (np.linalg.norm(query) or 1)
+    return (vectors @ query) / np.where(norms == 0, 1, norms)
+
+
+class FederatedRetriever(BaseRetriever):
+    # Store name -> store; all must share one embedding space
+    stores: Dict[str, FAISS]
+    k: int = 8
+    # Candidates taken from each store before merging
+    fetch_k: int = 20
+
+    def search_store(self, name: str, query: np.ndarray) -> List[tuple]:
+        """(score, store name, row) for the fetch_k nearest rows of one store."""
+        index = self.stores[name].index
+        _, rows = search_rows(index, query, min(self.fetch_k, index.ntotal))
+        if not rows:
+            return []
+        scores = cosine_scores(query[0], index.reconstruct_batch(np.asarray(rows, dtype=np.int64)))
+        return [(float(score), name, row) for score, row in zip(scores, rows)]
+
+    def search_by_vector(self, embedding: List[float]) -> List[Document]:
+        query = np.array([embedding], dtype=np.float32)
+        with ThreadPoolExecutor(max_workers=len(self.stores) or 1) as pool:
+            hits = [hit for store_hits in pool.map(lambda name: self.search_store(name, query), self.stores)
+                    for hit in store_hits]
+        hits.sort(key=lambda hit: -hit[0])
+        docs = []
+        for score, name, row in hits[: self.k]:
+            store = self.stores[name]
+            doc = store.docstore.search(store.index_to_docstore_id[row])
+            docs.append(Document(page_content=doc.page_content, metadata={**doc.metadata, "store": name, "score": score}))
+        return docs
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        embedding_function = next(iter(self.stores.values())).embedding_function
+        return self.search_by_vector(embedding_function.embed_query(query))
+
+
+def get_federated_retriever(stores: Sequence[str], k: int = 8, fetch_k: int = 20, embeddings=None) -> FederatedRetriever:
+    """
+    Federated retriever over catalog names or store paths. Raises ValueError
+    when the stores were built with different embedding models or dimensions.
+    """
+    entries = [resolve(store) for store in stores]
+    spaces = {(entry.model_id, entry.dimensions) for entry in entries}
+    if len(spaces) > 1:
+        described = ", ".join(f"{entry.name}: {entry.model_id}@{entry.dimensions}" for entry in entries)
+        raise ValueError(f"Cannot federate stores with different embeddings ({described})")
+    # Stores loaded from the registry without explicit embeddings share one client per model
+    loaded = {entry.name: get_vector_store(entry.path, embeddings) for entry in entries}
+    return FederatedRetriever(stores=loaded, k=k, fetch_k=fetch_k)
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+from federated_retriever import FederatedRetriever, cosine_scores, get_federated_retriever
+from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+
+def build_store(texts, size=16, **kwargs):
+    embeddings = DeterministicFakeEmbedding(size=size)
+    return FAISS.from_texts(texts, embeddings, **kwargs)
+
+
+@pytest.mark.unit
+def test_results_merge_across_stores_by_cosine_similarity():
+    """
+    Test that hits from L2 and inner-product stores are ranked on one cosine scale and tagged.
+    """
+    guide = build_store(["guide policy", "password rules", "logging"])
+    code = build_store(["login view", "password rules", "upload handler"],
+                       distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT)
+    retriever = FederatedRetriever(stores={"guide": guide, "code": code}, k=3)
+    docs = retriever.invoke("password rules")
+    assert [doc.page_content for doc in docs[:2]] == ["password rules", "password rules"]
+    assert {doc.metadata["store"] for doc in docs[:2]} == {"guide", "code"}
+    assert docs[0].metadata["score"] == pytest.approx(1.0, abs=1e-5)
+    assert [doc.metadata["score"] for doc in docs] == sorted((doc.metadata["score"] for doc in docs), reverse=True)
+
+
+@pytest.mark.unit
+def test_cosine_scores_handle_zero_vectors():
+    """
+    Test that zero vectors score 0 instead of dividing by zero.
+    """
+    vectors = np.array([[1.0, 0.0], [0.0, 0.0], [-2.0, 0.0]], dtype=np.float32)
+    assert cosine_scores(np.array([3.0, 0.0], dtype=np.float32), vectors).tolist() == [1.0, 0.0, -1.0]
+
+
+@pytest.mark.unit
+def test_refuses_stores_with_different_embeddings(tmp_path):
+    """
+    Test that stores embedded at different dimensions cannot be federated.
+    """
+    build_store(["a"], size=16).save_local(str(tmp_path / "small"))
+    build_store(["b"], size=32).save_local(str(tmp_path / "large"))
+    with pytest.raises(ValueError, match="different embeddings"):
+        get_federated_retriever([str(tmp_path / "small"), str(tmp_path / "large")])
@@ -0,0 +1,155 @@
+"""
+Deterministic extraction of user-controllable parameters from raw HTTP requests.
+
+Parameters are pulled from the query string, urlencoded, multipart and JSON
+bodies, cookies and variable path segments, and returned as a compact summary
+that can be handed to the LLM instead of the full request with every header.
+"""
+
+import json
+import re
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+MAX_VALUE_LENGTH = 100
+
+NUMERIC_SEGMENT = re.compile(r"^\d+$")
+UUID_SEGMENT = re.compile(r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$")
+HEX_SEGMENT = re.compile(r"^[0-9a-fA-F]{16,}$")
+
+
+def segment_kind(segment: str) -> Optional[str]:
+    """Return "int", "uuid" or "hex" for variable path segments, else None."""
+    if NUMERIC_SEGMENT.match(segment):
+        return "int"
+    if UUID_SEGMENT.match(segment):
+        return "uuid"
+    if HEX_SEGMENT.match(segment):
+        return "hex"
+    return None
+
+
+def _truncate(value: str) -> str:
+    return value if len(value) <= MAX_VALUE_LENGTH else value[:MAX_VALUE_LENGTH] + "..."
+
+
+def _flatten_json(value, prefix: str, out: Dict[str, str]) -> None:
+    if isinstance(value, dict):
+        for key, child in value.items():
+            _flatten_json(child, f"{prefix}.{key}" if prefix else str(key), out)
+    elif isinstance(value, list):
+        for i, child in enumerate(value):
+            _flatten_json(child, f"{prefix}[{i}]", out)
+    else:
+        out[prefix or "<root>"] = _truncate(json.dumps(value) if not isinstance(value, str) else value)
+
+
+def _parse_multipart(body: str, content_type: str) -> Dict[str, str]:
+    match = re.search(r'boundary="?([^";]+)"?', content_type, re.I)
+    if not match:
+        return {}
+    fields = {}
+    for part in body.split("--" + match.group(1)):
+        headers, _, value = part.strip("\r\n").partition("\r\n\r\n")
+        name = re.search(r'\bname="([^"]*)"', headers)
+        if not name:
+            continue
+        filename = re.search(r'\bfilename="([^"]*)"', headers)
+        fields[name.group(1)] = f"<file {filename.group(1)}>" if filename else _truncate(value)
+    return fields
+
+
+def parse_request(raw: str) -> dict:
+    """
+    Parse a raw HTTP request into its request line and parameters grouped by
+    location (path, query, body, cookie). Empty locations are omitted.
+    """
+    head, _, body = raw.partition("\r\n\r\n")
+    if not _:
+        head, _, body = raw.partition("\n\n")
+    lines = head.splitlines()
+    request_line = lines[0] if lines else ""
+    method, _, rest = request_line.partition(" ")
+    target = rest.rsplit(" ", 1)[0] if " " in rest else rest
+
+    headers = {}
+    for line in lines[1:]:
+        name, sep, value = line.partition(":")
+        if sep:
+            headers[name.strip().lower()] = value.strip()
+
+    params: Dict[str, Dict[str, str]] = {}
+    parts = urlsplit(target)
+
+    path = {}
+    for i, segment in enumerate(parts.path.split("/")):
+        kind = segment_kind(segment)
+        if kind:
+            path[f"segment{i}:{kind}"] = segment
+    if path:
+        params["path"] = path
+
+    query = {name: _truncate(value) for name, value in parse_qsl(parts.query, keep_blank_values=True)}
+    if query:
+        params["query"] = query
+
+    content_type = headers.get("content-type", "")
+    body_params: Dict[str, str] = {}
+    if body:
+        if "application/x-www-form-urlencoded" in content_type:
+            body_params = {name: _truncate(value) for name, value in parse_qsl(body, keep_blank_values=True)}
+        elif "multipart/form-data" in content_type:
+            body_params = _parse_multipart(body, content_type)
+        elif "json" in content_type:
+            try:
+                _flatten_json(json.loads(body), "", body_params)
+            except ValueError:
+                body_params = {"<raw>": _truncate(body)}
+        elif body.strip():
+            body_params = {"<raw>": _truncate(body)}
+    if body_params:
+        params["body"] = body_params
+
+    cookies = {}
+    for pair in headers.get("cookie", "").split(";"):
+        name, sep, value = pair.strip().partition("=")
+        if sep:
+            cookies[name] = _truncate(value)
+    if cookies:
+        params["cookie"] = cookies
+
+    return {
+        "method": method.upper(),
+        "host": headers.get("host"),
+        "path": parts.path,
+        "request_line": request_line,
+        "content_type": content_type.split(";")[0] or None,
+        "params": params,
+    }
+
+
+def parameter_names(parsed: dict) -> List[str]:
+    """Location-qualified names of the non-cookie parameters, e.g. ["query:q", "body:email"]."""
+    return sorted(
+        f"{location}:{name}"
+        for location, values in parsed["params"].items()
+        if location != "cookie"
+        for name in values
+    )
+
+
+def has_user_input(parsed: dict) -> bool:
+    """
+    Whether the request carries user-controllable input worth analyzing.
+    Cookies alone do not count: they are the same session cookies on almost
+    every request, and are still listed whenever other input is present.
+    """
+    return any(location != "cookie" for location in parsed["params"])
+
+
+def summarize(parsed: dict) -> str:
+    """Compact, LLM-ready summary: the request line and host plus the extracted parameters as JSON."""
+    summary = {"params": parsed["params"]}
+    if parsed["content_type"]:
+        summary["content_type"] = parsed["content_type"]
+    return f"{parsed['request_line']}\nHost: {parsed['host']}\n{json.dumps(summary, separators=(',', ':'))}"
@@ -0,0 +1,53 @@
+import pytest
+from http_params import has_user_input, parameter_names, parse_request
+
+
+@pytest.mark.unit
+def test_parse_request_extracts_every_location():
+    """
+    Test that path, query, urlencoded body and cookie parameters are extracted.
+    """
+    raw = (
+        "POST /taskManager/12/edit/?next=/home HTTP/1.1\r\n"
+        "Host: vtm.rdpt.dev\r\n"
+        "Content-Type: application/x-www-form-urlencoded\r\n"
+        "Cookie: sessionid=abc; csrftoken=def\r\n\r\n"
+        "title=test&due_date=2025-01-01"
+    )
+    parsed = parse_request(raw)
+    assert parsed["method"] == "POST"
+    assert parsed["host"] == "vtm.rdpt.dev"
+    assert parsed["params"]["path"] == {"segment2:int": "12"}
+    assert parsed["params"]["query"] == {"next": "/home"}
+    assert parsed["params"]["body"] == {"title": "test", "due_date": "2025-01-01"}
+    assert parsed["params"]["cookie"] == {"sessionid": "abc", "csrftoken": "def"}
+    assert parameter_names(parsed) == ["body:due_date", "body:title", "path:segment2:int", "query:next"]
+
+
+@pytest.mark.unit
+def test_parse_request_json_and_multipart_bodies():
+    """
+    Test that JSON bodies are flattened and multipart file fields are summarized.
+    """
+    parsed = parse_request(
+        "POST /api HTTP/1.1\r\nContent-Type: application/json\r\n\r\n"
+        '{"user": {"name": "a", "roles": ["x"]}, "id": 3}'
+    )
+    assert parsed["params"]["body"] == {"user.name": "a", "user.roles[0]": "x", "id": "3"}
+
+    parsed = parse_request(
+        "POST /upload HTTP/1.1\r\nContent-Type: multipart/form-data; boundary=XYZ\r\n\r\n"
+        '--XYZ\r\nContent-Disposition: form-data; name="title"\r\n\r\nhello\r\n'
+        '--XYZ\r\nContent-Disposition: form-data; name="file"; filename="a.svg"\r\n'
+        "Content-Type: image/svg+xml\r\n\r\n<svg/>\r\n--XYZ--\r\n"
+    )
+    assert parsed["params"]["body"] == {"title": "hello", "file": "<file a.svg>"}
+
+
+@pytest.mark.unit
+def test_cookies_alone_are_not_user_input():
+    """
+    Test that a static request carrying only session cookies is skipped.
+    """
+    parsed = parse_request("GET /static/app.js HTTP/1.1\r\nCookie: sessionid=abc\r\n\r\n")
+    assert not has_user_input(parsed)
@@ -0,0 +1,67 @@
+"""
+Hybrid lexical + vector retrieval over a saved FAISS store.
+
+Vector and BM25 candidates are fused with reciprocal rank fusion, so chunks
+that mention the exact identifiers in a question rank high even when their
+embeddings do not, and a much smaller k covers the same ground as a large
+vector-only k.
+"""
+
+import os
+from typing import List
+
+import numpy as np
+from langchain_community.vectorstores import FAISS
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from lexical_index import LEXICAL_FILE, BM25Index, store_texts
+from vector_store_registry import get_vector_store
+
+
+class HybridRetriever(BaseRetriever):
+    store: FAISS
+    lexical: BM25Index
+    k: int = 8
+    # Candidates taken from each ranking before fusion
+    fetch_k: int = 50
+    # Reciprocal rank fusion constant; larger values flatten the rank weights
+    rrf_k: int = 60
+
+    def vector_rows(self, query: str) -> List[int]:
+        embedding = np.array([self.store.embedding_function.embed_query(query)], dtype=np.float32)
+        _, rows = self.store.index.search(embedding, self.fetch_k)
+        return [int(row) for row in rows[0] if row != -1]
+
+    def lexical_rows(self, query: str) -> List[int]:
+        return [row for row, _ in self.lexical.search(query, self.fetch_k)]
+
+    def fused_rows(self, query: str) -> List[int]:
+        scores = {}
+        for ranking in (self.vector_rows(query), self.lexical_rows(query)):
+            for rank, row in enumerate(ranking):
+                scores[row] = scores.get(row, 0.0) + 1.0 / (self.rrf_k + rank + 1)
+        return sorted(scores, key=lambda row: (-scores[row], row))[: self.k]
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return [self.store.docstore.search(self.store.index_to_docstore_id[row]) for row in self.fused_rows(query)]
+
+
+def load_lexical_index(db: FAISS, path: str) -> BM25Index:
+    """
+    Load the BM25 index saved with a store. Stores saved before bm25.json
+    existed, or whose index no longer matches, get one built in memory.
+    """
+    if os.path.isfile(os.path.join(path, LEXICAL_FILE)):
+        lexical = BM25Index.load(path)
+        if len(lexical.lengths) == db.index.ntotal:
+            return lexical
+    print(f"Building lexical index for {path}")
+    return BM25Index.build(store_texts(db))
+
+
+def get_hybrid_retriever(path: str, k: int = 8, fetch_k: int = 50, **kwargs) -> HybridRetriever:
+    """Hybrid retriever over the shared store saved at path."""
+    db = get_vector_store(path)
+    return HybridRetriever(store=db, lexical=load_lexical_index(db, path), k=k, fetch_k=fetch_k, **kwargs)
@@ -0,0 +1,146 @@
+"""
+Incremental re-indexing for FAISS vector databases.
+
+A manifest of per-file content hashes and chunk IDs is saved next to the
+index so later runs only embed new or changed files and drop the chunks of
+files that were modified or deleted.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+from embedding_executor import build_index
+from index_types import read_index_metadata, save_store
+from vector_store_registry import check_embeddings, load_store
+
+MANIFEST_FILE = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+def list_files(root: str, glob: str = "**/*.*", suffixes: Optional[List[str]] = None) -> List[str]:
+    """
+    List the files under root matching glob, skipping hidden files and directories
+    the same way DirectoryLoader does by default.
+    """
+    files = []
+    for path in sorted(Path(root).glob(glob)):
+        if not path.is_file():
+            continue
+        if any(part.startswith(".") for part in path.relative_to(root).parts):
+            continue
+        if suffixes and path.suffix not in suffixes:
+            continue
+        files.append(str(path))
+    return files
+
+
+def file_hash(file_path: str) -> str:
+    """Return the SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest(index_path: str) -> Dict[str, dict]:
+    """Load the per-file manifest saved next to an index, or an empty one."""
+    manifest_path = os.path.join(index_path, MANIFEST_FILE)
+    if not os.path.isfile(manifest_path):
+        return {}
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest["files"]
+
+
+def save_manifest(index_path: str, files: Dict[str, dict]) -> None:
+    """Write the manifest atomically so an interrupted run never leaves it half written."""
+    manifest_path = os.path.join(index_path, MANIFEST_FILE)
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": MANIFEST_VERSION, "files": files}, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+def sync_index(
+    index_path: str,
+    files: List[str],
+    load: Callable[[str], List[Document]],
+    splitter,
+    embeddings,
+    incremental: bool = True,
+    source: Optional[dict] = None,
+) -> Optional[FAISS]:
+    """
+    Bring the FAISS store at index_path in line with files.
+
+    load(file_path) returns the documents for a single file. In incremental mode
+    only new or changed files are loaded, split and embedded; chunks belonging to
+    changed or deleted files are removed from the existing store. Otherwise the
+    store is rebuilt from scratch, as it is when the existing store was built
+    with a different embedding model or dimension. Either way the manifest is
+    rewritten so the next run can be incremental. source is recorded for the
+    store catalog (see save_store).
+    """
+    manifest = load_manifest(index_path) if incremental else {}
+    if manifest and read_index_metadata(index_path)["params"]:
+        # Approximate and quantized indexes are trained on the whole corpus, so
+        # rebuild them; the embedding cache still spares re-embedding unchanged chunks
+        print("Rebuilding approximate or quantized index from scratch")
+        manifest = {}
+    if manifest and os.path.isfile(os.path.join(index_path, "index.faiss")):
+        try:
+            check_embeddings(embeddings, index_path)
+        except ValueError as e:
+            # Vectors from another model or dimension cannot be mixed into the store
+            print(f"Rebuilding from scratch: {e}")
+            manifest = {}
+    db = None
+    if manifest and os.path.isfile(os.path.join(index_path, "index.faiss")):
+        db = load_store(index_path, embeddings, writable=True)
+    else:
+        # Without a manifest the chunk IDs of the existing store are unknown
+        manifest = {}
+
+    current = {file_path: file_hash(file_path) for file_path in files}
+    changed = [p for p, sha in current.items() if manifest.get(p, {}).get("sha256") != sha]
+    stale = [p for p, entry in manifest.items() if current.get(p) != entry["sha256"]]
+
+    stale_ids = [chunk_id for p in stale for chunk_id in manifest.pop(p)["chunks"]]
+    if db is not None and stale_ids:
+        db.delete(stale_ids)
+
+    texts, ids = [], []
+    for file_path in changed:
+        try:
+            chunks = splitter.split_documents(load(file_path))
+        except Exception as e:
+            print(f"Error loading {file_path}: {e}")
+            continue
+        chunk_ids = [f"{file_path}#{i}" for i in range(len(chunks))]
+        manifest[file_path] = {"sha256": current[file_path], "chunks": chunk_ids}
+        texts.extend(chunks)
+        ids.extend(chunk_ids)
+
+    print(
+        f"{len(changed)} new or changed, {len(set(stale) - set(changed))} deleted, "
+        f"{len(current) - len(changed)} unchanged files; embedding {len(texts)} chunks"
+    )
+
+    db = build_index(texts, embeddings, db=db, ids=ids)
+
+    if db is None:
+        print("Nothing to index")
+        return None
+
+    save_store(db, index_path, source=source)
+    save_manifest(index_path, manifest)
+    return db
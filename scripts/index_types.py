@@ -0,0 +1,179 @@
+"""
+Approximate FAISS index types for saved vector stores.
+
+Stores are embedded into a flat index and, when saved, optionally rebuilt as
+IVF-Flat, HNSW or IVF-PQ, trained on a sample of the vectors. The index type
+and its parameters are recorded in index.json next to index.faiss so loaders
+can restore the search-time settings (nprobe, efSearch).
+
+Choose the type with FAISS_INDEX_TYPE (flat, ivf_flat, hnsw, ivf_pq) or the
+index_type argument of save_store. Flat, IVF-Flat and HNSW vectors can also
+be stored scalar-quantized with FAISS_ENCODING (float32, fp16, int8).
+index.json also records the embedding model and dimension the store was
+built with, so queries are embedded with matching settings.
+"""
+
+import json
+import math
+import os
+from typing import Optional
+
+from lexical_index import build_lexical_index
+from metadata_index import build_metadata_index
+
+INDEX_FILE = "index.json"
+INDEX_TYPES = ("flat", "ivf_flat", "hnsw", "ivf_pq")
+DEFAULT_INDEX_TYPE = os.getenv("FAISS_INDEX_TYPE", "flat")
+# Encoding -> faiss ScalarQuantizer type; float32 keeps the vectors as they are
+ENCODINGS = {"float32": None, "fp16": "QT_fp16", "int8": "QT_8bit"}
+
+DEFAULT_PARAMS = {
+    "nlist": None,  # None: 4 * sqrt(number of vectors)
+    "nprobe": 8,
+    "hnsw_m": 32,
+    "ef_construction": 40,
+    "ef_search": 64,
+    "pq_m": 16,
+    "pq_bits": 8,
+    "train_sample": 20000,
+    "encoding": os.getenv("FAISS_ENCODING", "float32"),
+}
+
+# faiss warns below roughly this many training points per IVF centroid
+MIN_POINTS_PER_CENTROID = 39
+
+
+def index_params(**overrides) -> dict:
+    params = dict(DEFAULT_PARAMS)
+    params.update({key: value for key, value in overrides.items() if value is not None})
+    return params
+
+
+def _divisor_at_most(d: int, limit: int) -> int:
+    return max(m for m in range(1, min(d, limit) + 1) if d % m == 0)
+
+
+def make_index(vectors, metric: int, index_type: str, params: dict):
+    """
+    Build and fill an index of index_type over vectors (float32, n x d).
+    Returns (index, index_type, params) with the type and parameters actually
+    used: IVF types fall back to flat when there are too few vectors to train.
+    """
+    import faiss
+    import numpy as np
+
+    n, d = vectors.shape
+    params = dict(params)
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type {index_type!r}, expected one of {INDEX_TYPES}")
+    if params["encoding"] not in ENCODINGS:
+        raise ValueError(f"Unknown encoding {params['encoding']!r}, expected one of {tuple(ENCODINGS)}")
+
+    if index_type.startswith("ivf"):
+        nlist = params["nlist"] or int(4 * math.sqrt(n))
+        params["nlist"] = min(nlist, n // MIN_POINTS_PER_CENTROID)
+        if index_type == "ivf_pq":
+            params["pq_m"] = _divisor_at_most(d, params["pq_m"])
+            if n < 2 ** params["pq_bits"]:
+                params["nlist"] = 0
+        if params["nlist"] < 1:
+            print(f"Too few vectors ({n}) to train {index_type}, keeping a flat index")
+            index_type = "flat"
+
+    qtype = ENCODINGS[params["encoding"]]
+    qtype = getattr(faiss.ScalarQuantizer, qtype) if qtype else None
+    if index_type == "flat":
+        index = faiss.IndexScalarQuantizer(d, qtype, metric) if qtype is not None else faiss.IndexFlat(d, metric)
+    elif index_type == "hnsw":
+        if qtype is not None:
+            index = faiss.IndexHNSWSQ(d, qtype, params["hnsw_m"], metric)
+        else:
+            index = faiss.IndexHNSWFlat(d, params["hnsw_m"], metric)
+        index.hnsw.efConstruction = params["ef_construction"]
+    else:
+        quantizer = faiss.IndexFlat(d, metric)
+        if index_type == "ivf_pq":
+            # Product quantization already compresses the vectors
+            params["encoding"] = "pq"
+            index = faiss.IndexIVFPQ(quantizer, d, params["nlist"], params["pq_m"], params["pq_bits"], metric)
+        elif qtype is not None:
+            index = faiss.IndexIVFScalarQuantizer(quantizer, d, params["nlist"], qtype, metric)
+        else:
+            index = faiss.IndexIVFFlat(quantizer, d, params["nlist"], metric)
+
+    if not index.is_trained:
+        sample = vectors
+        if n > params["train_sample"]:
+            rows = np.random.default_rng(0).choice(n, params["train_sample"], replace=False)
+            sample = vectors[rows]
+        index.train(sample)
+    if index_type.startswith("ivf"):
+        # LangChain's MMR search reconstructs vectors by id
+        index.make_direct_map()
+
+    index.add(vectors)
+    set_search_params(index, index_type, params)
+    return index, index_type, params
+
+
+def set_search_params(index, index_type: str, params: dict) -> None:
+    if index_type.startswith("ivf"):
+        index.nprobe = params["nprobe"]
+    elif index_type == "hnsw":
+        index.hnsw.efSearch = params["ef_search"]
+
+
+def all_vectors(index):
+    """Every vector of an index that supports reconstruction, as an n x d float32 array."""
+    return index.reconstruct_n(0, index.ntotal)
+
+
+def reindex(db, index_type: str = DEFAULT_INDEX_TYPE, **overrides) -> dict:
+    """Replace the flat index of a LangChain FAISS store. Returns the recorded metadata."""
+    params = index_params(**overrides)
+    if (index_type == "flat" and params["encoding"] == "float32") or db.index.ntotal == 0:
+        metadata = {"index_type": "flat", "params": {}}
+    else:
+        db.index, index_type, params = make_index(all_vectors(db.index), db.index.metric_type, index_type, params)
+        metadata = {"index_type": index_type, "params": params}
+    metadata["embedding"] = {
+        "model_id": getattr(db.embedding_function, "model_id", None),
+        "dimensions": db.index.d,
+    }
+    return metadata
+
+
+def read_index_metadata(path: str) -> dict:
+    """The recorded index type of a saved store; stores saved before index.json are flat."""
+    try:
+        with open(os.path.join(path, INDEX_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"index_type": "flat", "params": {}}
+
+
+def apply_index_metadata(index, path: str) -> None:
+    """Restore the search-time settings recorded for a loaded index."""
+    metadata = read_index_metadata(path)
+    set_search_params(index, metadata["index_type"], index_params(**metadata["params"]))
+
+
+def save_store(db, path: str, index_type: Optional[str] = None, source: Optional[dict] = None, **overrides) -> dict:
+    """
+    Save a store built on a flat index, first rebuilding it as index_type
+    (default FAISS_INDEX_TYPE), and record the index type next to it. The
+    BM25 index used for hybrid retrieval and the metadata index used for
+    filtered search are rebuilt alongside. source describes the corpus for
+    the store catalog, e.g. {"type": "code", "chunk_size": 8000, "chunk_overlap": 100}.
+    """
+    metadata = reindex(db, index_type or DEFAULT_INDEX_TYPE, **overrides)
+    if source:
+        metadata["source"] = source
+    db.save_local(path)
+    build_lexical_index(db, path)
+    build_metadata_index(db, path).close()
+    with open(os.path.join(path, INDEX_FILE), "w", encoding="utf-8") as f:
+        json.dump(metadata, f, indent=1)
+    encoding = metadata["params"].get("encoding", "float32")
+    print(f"Saved {db.index.ntotal} {db.index.d}-dimension vectors to {path} as a {metadata['index_type']} {encoding} index")
+    return metadata
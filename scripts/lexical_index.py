@@ -0,0 +1,101 @@
+"""
+BM25 inverted index saved next to each FAISS store.
+
+Code questions often hinge on exact identifiers (cursor.execute, .raw(,
+user_passes_test) that dense retrieval ranks poorly. The index is keyed by
+FAISS row so lexical and vector hits can be fused (see hybrid_retriever).
+Tokens are lowercased identifiers plus each adjacent pair of a dotted chain,
+so "cursor.execute(" matches both "cursor.execute" and "execute".
+"""
+
+import json
+import math
+import os
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+LEXICAL_FILE = "bm25.json"
+LEXICAL_VERSION = 1
+
+IDENTIFIER_CHAIN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)*")
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for match in IDENTIFIER_CHAIN.finditer(text):
+        parts = match.group(0).lower().split(".")
+        tokens.extend(parts)
+        tokens.extend(f"{a}.{b}" for a, b in zip(parts, parts[1:]))
+    return tokens
+
+
+class BM25Index:
+    """Okapi BM25 over documents numbered by FAISS row."""
+
+    def __init__(self, postings: Dict[str, List[Tuple[int, int]]], lengths: List[int], k1: float = 1.2, b: float = 0.75):
+        self.postings = postings
+        self.lengths = lengths
+        self.k1 = k1
+        self.b = b
+        self.average_length = sum(lengths) / len(lengths) if lengths else 0.0
+
+    @classmethod
+    def build(cls, texts: Iterable[str], **kwargs) -> "BM25Index":
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        lengths = []
+        for row, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                postings.setdefault(term, []).append((row, tf))
+        return cls(postings, lengths, **kwargs)
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[int, float]]:
+        """Return up to k (row, score) pairs, best first. Rows without a query term are omitted."""
+        scores: Dict[int, float] = {}
+        n = len(self.lengths)
+        for term in set(tokenize(query)):
+            matches = self.postings.get(term, [])
+            if not matches:
+                continue
+            idf = math.log(1 + (n - len(matches) + 0.5) / (len(matches) + 0.5))
+            for row, tf in matches:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[row] / self.average_length)
+                scores[row] = scores.get(row, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+
+    def save(self, path: str) -> None:
+        data = {
+            "version": LEXICAL_VERSION,
+            "k1": self.k1,
+            "b": self.b,
+            "lengths": self.lengths,
+            "postings": self.postings,
+        }
+        tmp_path = os.path.join(path, LEXICAL_FILE + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, os.path.join(path, LEXICAL_FILE))
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+        with open(os.path.join(path, LEXICAL_FILE), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != LEXICAL_VERSION:
+            raise ValueError(f"Unsupported lexical index version in {path}")
+        postings = {term: [tuple(posting) for posting in matches] for term, matches in data["postings"].items()}
+        return cls(postings, data["lengths"], k1=data["k1"], b=data["b"])
+
+
+def store_texts(db) -> Iterable[str]:
+    """The page contents of a LangChain FAISS store in row order."""
+    for row in range(db.index.ntotal):
+        yield db.docstore.search(db.index_to_docstore_id[row]).page_content
+
+
+def build_lexical_index(db, path: str) -> BM25Index:
+    """Build and save the BM25 index for a store saved at path."""
+    index = BM25Index.build(store_texts(db))
+    index.save(path)
+    return index
@@ -0,0 +1,41 @@
+import pytest
+from lexical_index import BM25Index, tokenize
+
+texts = [
+    "cursor.execute(\"SELECT * FROM users WHERE id = %s\" % user_id)",
+    "User.objects.raw(query)",
+    "@user_passes_test(lambda u: u.is_staff)\ndef admin_view(request):",
+    "def index(request):\n    return render(request, 'index.html')",
+]
+
+
+@pytest.mark.unit
+def test_tokenize_keeps_identifiers_and_dotted_pairs():
+    """
+    Test that code is split into identifiers plus adjacent dotted pairs.
+    """
+    assert tokenize("cursor.execute(sql)") == ["cursor", "execute", "cursor.execute", "sql"]
+    assert tokenize("@user_passes_test") == ["user_passes_test"]
+
+
+@pytest.mark.unit
+def test_search_ranks_exact_identifiers_first():
+    """
+    Test that the chunk containing the queried identifier ranks first.
+    """
+    index = BM25Index.build(texts)
+    assert index.search("Where is cursor.execute used?", k=1)[0][0] == 0
+    assert index.search(".raw(", k=1)[0][0] == 1
+    assert index.search("user_passes_test", k=1)[0][0] == 2
+    assert index.search("no such identifier_anywhere") == []
+
+
+@pytest.mark.unit
+def test_save_and_load_round_trip(tmp_path):
+    """
+    Test that a saved index scores identically after loading.
+    """
+    index = BM25Index.build(texts)
+    index.save(str(tmp_path))
+    loaded = BM25Index.load(str(tmp_path))
+    assert loaded.search("request render", k=4) == index.search("request render", k=4)
@@ -0,0 +1,211 @@
+"""
+Disk-backed exact-match cache of chat model responses.
+
+sca_repo.py, sca_deterministic_few_shot.py and the DAST stages are re-run on
+mostly unchanged inputs, paying full latency and cost every time. Responses
+are stored in SQLite keyed by a hash of the rendered messages, the model id,
+the temperature and any bound call arguments (tools, stop sequences), with
+the token usage of the original call, so a repeated prompt is answered from
+disk. Entries expire after LLM_CACHE_TTL_SECONDS and the least recently used
+are evicted once the cache grows past LLM_CACHE_MAX_MB.
+
+CachedChatModel wraps a chat model so every chain, structured-output call
+and stream goes through the cache; cache hits are replayed to streaming
+callers chunk by chunk and never reach the wrapped model's rate limiter.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Iterator, List, Optional
+
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.load import dumps
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, message_chunk_to_message
+from langchain_core.messages.tool import tool_call_chunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "vector_databases", "llm_cache.sqlite"
+)
+DEFAULT_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+DEFAULT_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_MB", "200")) * 1024 * 1024
+
+
+class ResponseCache:
+    """SQLite store of serialized chat responses with TTL and size-bounded LRU eviction."""
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        ttl: int = DEFAULT_TTL_SECONDS,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.tokens_saved = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model_id TEXT,
+                temperature REAL,
+                response TEXT NOT NULL,
+                total_tokens INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                created INTEGER NOT NULL,
+                last_used INTEGER NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self._conn.commit()
+
+    @staticmethod
+    def key(messages: List[BaseMessage], model_id: Optional[str], temperature: Optional[float], **kwargs) -> str:
+        payload = json.dumps(
+            {"messages": dumps(messages), "model_id": model_id, "temperature": temperature, "kwargs": kwargs},
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def lookup(self, key: str) -> Optional[AIMessage]:
+        now = int(time.time())
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, total_tokens FROM responses WHERE key = ? AND created > ?", (key, now - self.ttl)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            self.tokens_saved += row[1]
+        message = AIMessage.model_validate_json(row[0])
+        # The usage_metadata is the original call's; callers tallying spend skip replayed messages
+        message.response_metadata["cached"] = True
+        return message
+
+    def store(self, key: str, message: AIMessage, model_id: Optional[str], temperature: Optional[float]) -> None:
+        response = message.model_dump_json()
+        total_tokens = (message.usage_metadata or {}).get("total_tokens", 0)
+        now = int(time.time())
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, model_id, temperature, response, total_tokens, size, created, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, model_id, temperature, response, total_tokens, len(response), now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: int) -> None:
+        self._conn.execute("DELETE FROM responses WHERE created <= ?", (now - self.ttl,))
+        # Drop the least recently used entries beyond the size bound
+        self._conn.execute(
+            "DELETE FROM responses WHERE key IN (SELECT key FROM "
+            "(SELECT key, SUM(size) OVER (ORDER BY last_used DESC, rowid DESC) AS running FROM responses) "
+            "WHERE running > ?)",
+            (self.max_bytes,),
+        )
+
+    def report(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        return (
+            f"LLM response cache: {self.hits} hits, {self.misses} misses ({rate:.0%} hit rate), "
+            f"{self.tokens_saved} tokens saved"
+        )
+
+
+def replay_chunks(message: AIMessage) -> Iterator[AIMessageChunk]:
+    """Split a cached message back into stream chunks; the last one carries usage and tool calls."""
+    pieces = re.findall(r"\s*\S+", message.content) if isinstance(message.content, str) else []
+    if not pieces or message.tool_calls:
+        pieces = [message.content]
+    for piece in pieces[:-1]:
+        yield AIMessageChunk(content=piece)
+    yield AIMessageChunk(
+        content=pieces[-1],
+        usage_metadata=message.usage_metadata,
+        response_metadata=message.response_metadata,
+        tool_call_chunks=[
+            tool_call_chunk(name=call["name"], args=json.dumps(call["args"]), id=call["id"], index=index)
+            for index, call in enumerate(message.tool_calls)
+        ],
+    )
+
+
+class CachedChatModel(BaseChatModel):
+    """Chat model wrapper that answers repeated prompts from a ResponseCache."""
+
+    llm: BaseChatModel
+    response_cache: ResponseCache
+
+    @property
+    def _llm_type(self) -> str:
+        return f"cached-{self.llm._llm_type}"
+
+    @property
+    def model_id(self) -> Optional[str]:
+        return getattr(self.llm, "model_id", None) or getattr(self.llm, "model", None)
+
+    @property
+    def temperature(self) -> Optional[float]:
+        return getattr(self.llm, "temperature", None)
+
+    def _key(self, messages: List[BaseMessage], stop: Optional[List[str]], **kwargs) -> str:
+        return ResponseCache.key(messages, self.model_id, self.temperature, stop=stop, **kwargs)
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        key = self._key(messages, stop, **kwargs)
+        message = self.response_cache.lookup(key)
+        if message is None:
+            # The wrapped model's own callbacks, such as the rate limiter, only see cache misses
+            message = self.llm.invoke(messages, stop=stop, **kwargs)
+            self.response_cache.store(key, message, self.model_id, self.temperature)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        key = self._key(messages, stop, **kwargs)
+        cached = self.response_cache.lookup(key)
+        if cached is not None:
+            for chunk in replay_chunks(cached):
+                yield ChatGenerationChunk(message=chunk)
+            return
+        streamed = None
+        for chunk in self.llm.stream(messages, stop=stop, **kwargs):
+            streamed = chunk if streamed is None else streamed + chunk
+            yield ChatGenerationChunk(message=chunk)
+        # Only complete streams are cached
+        if streamed is not None:
+            message = message_chunk_to_message(streamed)
+            self.response_cache.store(key, message, self.model_id, self.temperature)
+
+    def bind_tools(self, tools, **kwargs):
+        """Bind tools in the wrapped model's format; the bound arguments become part of the cache key."""
+        return self.bind(**self.llm.bind_tools(tools, **kwargs).kwargs)
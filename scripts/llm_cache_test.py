@@ -0,0 +1,62 @@
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from llm_cache import CachedChatModel, ResponseCache
+
+
+def cached_model(tmp_path, responses, **cache_kwargs):
+    underlying = GenericFakeChatModel(messages=iter(responses))
+    cache = ResponseCache(str(tmp_path / "llm_cache.sqlite"), **cache_kwargs)
+    return CachedChatModel(llm=underlying, response_cache=cache), cache
+
+
+@pytest.mark.unit
+def test_repeated_prompts_are_answered_from_disk(tmp_path):
+    """
+    Test that an identical prompt is served from the cache with its recorded usage.
+    """
+    usage = {"input_tokens": 7, "output_tokens": 3, "total_tokens": 10}
+    answer = AIMessage(content="No injection", usage_metadata=usage)
+    llm, cache = cached_model(tmp_path, [answer, AIMessage(content="second call")])
+    first = llm.invoke("Analyze /login")
+    assert first.content == "No injection"
+    assert "cached" not in first.response_metadata
+    replayed = llm.invoke("Analyze /login")
+    assert replayed.content == "No injection"
+    assert replayed.usage_metadata["total_tokens"] == 10
+    assert replayed.response_metadata["cached"] is True
+    assert llm.invoke("Analyze /upload").content == "second call"
+    assert (cache.hits, cache.misses, cache.tokens_saved) == (1, 2, 10)
+
+    # A new process sees the same entries
+    reopened = CachedChatModel(llm=GenericFakeChatModel(messages=iter([])), response_cache=ResponseCache(cache.path))
+    assert reopened.invoke([HumanMessage(content="Analyze /login")]).content == "No injection"
+
+
+@pytest.mark.unit
+def test_cached_responses_replay_as_a_stream(tmp_path):
+    """
+    Test that streaming callers get cached responses back chunk by chunk.
+    """
+    llm, cache = cached_model(tmp_path, [AIMessage(content="URL: /login\nMethod: POST")])
+    first = [chunk.content for chunk in llm.stream("Analyze /login")]
+    replayed = list(llm.stream("Analyze /login"))
+    assert "".join(first) == "".join(chunk.content for chunk in replayed) == "URL: /login\nMethod: POST"
+    assert len(replayed) > 1
+    assert replayed[-1].response_metadata["cached"] is True
+    assert cache.hits == 1
+
+
+@pytest.mark.unit
+def test_expired_and_oversized_entries_are_evicted(tmp_path):
+    """
+    Test that entries past the TTL miss and the least recently used are dropped past the size bound.
+    """
+    cache = ResponseCache(str(tmp_path / "llm_cache.sqlite"), ttl=3600, max_bytes=2000)
+    for name in ("a", "b", "c"):
+        cache.store(name, AIMessage(content=name * 600), "model", 0.2)
+    assert cache.lookup("a") is None
+    assert cache.lookup("c").content == "c" * 600
+
+    cache.ttl = 0
+    assert cache.lookup("c") is None
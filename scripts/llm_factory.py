@@ -0,0 +1,262 @@
+"""
+Shared Bedrock chat model factory with a cross-process rate limiter.
+
+Every script used to build its own ChatBedrock, each with its own boto3
+client and connection pool and no idea of the account's request- and
+token-per-minute quotas, so running sca_repo.py next to the DAST stages and
+the agents made them throttle each other. get_llm() instead hands out
+models built on one pooled client per region, and every call first takes
+a request and its estimated tokens from a token bucket kept in a lock file
+(LLM_RATE_LIMIT_FILE), which all threads and processes on the machine share.
+
+The bucket adapts: a throttling response from Bedrock halves the refill
+rate for everyone, and each successful call earns a little of it back.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: the limiter is shared across threads only
+    fcntl = None
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from llm_cache import CachedChatModel, ResponseCache
+
+DEFAULT_LLM_MODEL_ID = os.getenv("LLM_MODEL_ID", "us.anthropic.claude-3-5-haiku-20241022-v1:0")
+# Account quotas for the model; lower them when other tools share the account
+REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "50"))
+TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "200000"))
+RATE_LIMIT_FILE = os.getenv("LLM_RATE_LIMIT_FILE", os.path.join(tempfile.gettempdir(), "llm_rate_limit.json"))
+MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "25"))
+# Answer repeated prompts from the on-disk response cache (see llm_cache.py)
+CACHE_RESPONSES = os.getenv("LLM_CACHE", "true").lower() in ("1", "true", "yes")
+# The refill rate never drops below this fraction of the quota
+MIN_RATE_SCALE = 0.1
+# Fraction of the quota restored by each successful call after throttling
+RECOVERY_STEP = 0.05
+THROTTLING_CODES = {"ThrottlingException", "TooManyRequestsException", "ServiceQuotaExceededException"}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count used to reserve budget before a call (~4 characters per token)."""
+    return len(text) // 4 + 1
+
+
+class RateLimiter:
+    """
+    Token bucket for requests and tokens per minute. The bucket state lives
+    in a JSON file locked with flock, so every limiter on the same file,
+    in any thread or process, draws from the same budget.
+    """
+
+    def __init__(
+        self,
+        path: str = RATE_LIMIT_FILE,
+        requests_per_minute: float = REQUESTS_PER_MINUTE,
+        tokens_per_minute: float = TOKENS_PER_MINUTE,
+    ):
+        self.path = path
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._lock = threading.Lock()
+
+    def _update(self, change, now: Optional[float] = None) -> Any:
+        """Refill the shared state to now, apply change(state) under the lock and save it."""
+        now = time.time() if now is None else now
+        with self._lock, open(self.path, "a+") as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            f.seek(0)
+            try:
+                state = json.loads(f.read() or "{}")
+            except ValueError:
+                state = {}
+            scale = state.get("scale", 1.0)
+            elapsed = max(0.0, now - state.get("updated", now))
+            state = {
+                "scale": scale,
+                "updated": now,
+                "requests": min(
+                    self.requests_per_minute,
+                    state.get("requests", self.requests_per_minute) + elapsed * scale * self.requests_per_minute / 60,
+                ),
+                "tokens": min(
+                    self.tokens_per_minute,
+                    state.get("tokens", self.tokens_per_minute) + elapsed * scale * self.tokens_per_minute / 60,
+                ),
+            }
+            result = change(state)
+            f.seek(0)
+            f.truncate()
+            f.write(json.dumps(state))
+            return result
+
+    def try_acquire(self, tokens: int, now: Optional[float] = None) -> float:
+        """
+        Take one request and tokens from the bucket if both are available and
+        return 0, else return the seconds to wait before trying again.
+        """
+        # A single call larger than the whole bucket only waits for a full one
+        tokens = min(tokens, self.tokens_per_minute)
+
+        def take(state):
+            if state["requests"] >= 1 and state["tokens"] >= tokens:
+                state["requests"] -= 1
+                state["tokens"] -= tokens
+                return 0.0
+            rate = state["scale"] / 60
+            waits = [(1 - state["requests"]) / (rate * self.requests_per_minute),
+                     (tokens - state["tokens"]) / (rate * self.tokens_per_minute)]
+            return max(waits)
+
+        return self._update(take, now)
+
+    def acquire(self, tokens: int) -> None:
+        """Block until one request and tokens are available."""
+        while True:
+            wait = self.try_acquire(tokens)
+            if not wait:
+                return
+            time.sleep(min(wait, 5.0))
+
+    def record_usage(self, reserved: int, used: int, now: Optional[float] = None) -> None:
+        """Charge the difference between a call's reserved and actual tokens, and recover some rate."""
+
+        def settle(state):
+            state["tokens"] -= used - reserved
+            state["scale"] = min(1.0, state["scale"] + RECOVERY_STEP)
+
+        self._update(settle, now)
+
+    def record_throttle(self, now: Optional[float] = None) -> None:
+        """Halve the shared refill rate and empty the request bucket after a throttling response."""
+
+        def back_off(state):
+            state["scale"] = max(MIN_RATE_SCALE, state["scale"] / 2)
+            state["requests"] = min(state["requests"], 0.0)
+
+        self._update(back_off, now)
+
+    def scale(self, now: Optional[float] = None) -> float:
+        return self._update(lambda state: state["scale"], now)
+
+
+class RateLimitHandler(BaseCallbackHandler):
+    """Callback that waits for the rate limiter before each chat model call and settles usage after."""
+
+    def __init__(self, limiter: RateLimiter):
+        self.limiter = limiter
+        self._reserved = {}  # run id -> tokens reserved for that call
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[list], *, run_id, **kwargs) -> None:
+        text = "".join(str(message.content) for batch in messages for message in batch)
+        tokens = estimate_tokens(text)
+        self.limiter.acquire(tokens)
+        self._reserved[run_id] = tokens
+
+    def on_llm_end(self, response: LLMResult, *, run_id, **kwargs) -> None:
+        reserved = self._reserved.pop(run_id, 0)
+        used = 0
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                used += usage.get("total_tokens", 0)
+        if not used:
+            usage = (response.llm_output or {}).get("usage") or {}
+            used = usage.get("total_tokens") or reserved
+        self.limiter.record_usage(reserved, used)
+
+    def on_llm_error(self, error: BaseException, *, run_id, **kwargs) -> None:
+        self._reserved.pop(run_id, None)
+
+
+_limiter = None
+_response_cache = None
+_clients = {}
+_models = {}
+_factory_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """The process-wide limiter over the machine-wide budget."""
+    global _limiter
+    with _factory_lock:
+        if _limiter is None:
+            _limiter = RateLimiter()
+        return _limiter
+
+
+def _record_throttling(response=None, caught_exception=None, **kwargs) -> None:
+    """botocore needs-retry hook: every throttled attempt, retried or not, slows the shared bucket."""
+    code = None
+    if response is not None:
+        http_response, parsed = response
+        code = parsed.get("Error", {}).get("Code")
+        if http_response.status_code == 429:
+            code = code or "ThrottlingException"
+    elif caught_exception is not None:
+        code = type(caught_exception).__name__
+    if code in THROTTLING_CODES:
+        get_rate_limiter().record_throttle()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """The process-wide handle on the on-disk LLM response cache, or None when LLM_CACHE is off."""
+    global _response_cache
+    if not CACHE_RESPONSES:
+        return None
+    with _factory_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache()
+        return _response_cache
+
+
+def bedrock_client(service_name: str = "bedrock-runtime", region_name: Optional[str] = None):
+    """One boto3 client, and so one connection pool, per service and region for the whole process."""
+    import boto3
+    from botocore.config import Config
+
+    key = (service_name, region_name)
+    with _factory_lock:
+        if key not in _clients:
+            config = Config(max_pool_connections=MAX_CONNECTIONS, retries={"max_attempts": 6, "mode": "standard"})
+            client = boto3.client(service_name, region_name=region_name, config=config)
+            event = f"needs-retry.{client.meta.service_model.endpoint_prefix}"
+            client.meta.events.register_first(event, _record_throttling)
+            _clients[key] = client
+        return _clients[key]
+
+
+def get_llm(model_id: str = DEFAULT_LLM_MODEL_ID, temperature: float = 0.2, **kwargs):
+    """
+    Return the shared ChatBedrock for model_id and temperature, built on the
+    pooled client, rate limited and, unless LLM_CACHE=false, behind the
+    response cache. Extra ChatBedrock arguments give a separate model.
+    """
+    from langchain_aws import ChatBedrock
+
+    key = (model_id, temperature, repr(sorted(kwargs.items())))
+    with _factory_lock:
+        if key in _models:
+            return _models[key]
+    region_name = kwargs.pop("region_name", None)
+    llm = ChatBedrock(
+        model_id=model_id,
+        model_kwargs={"temperature": temperature},
+        client=bedrock_client("bedrock-runtime", region_name),
+        bedrock_client=bedrock_client("bedrock", region_name),
+        callbacks=[RateLimitHandler(get_rate_limiter())],
+        **kwargs,
+    )
+    if CACHE_RESPONSES:
+        llm = CachedChatModel(llm=llm, response_cache=get_response_cache())
+    with _factory_lock:
+        return _models.setdefault(key, llm)
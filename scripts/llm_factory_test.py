@@ -0,0 +1,62 @@
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from llm_factory import RateLimiter, RateLimitHandler, estimate_tokens
+
+
+@pytest.mark.unit
+def test_bucket_is_shared_through_the_state_file(tmp_path):
+    """
+    Test that limiters on the same file, as in separate processes, draw from one budget.
+    """
+    path = str(tmp_path / "rate.json")
+    first = RateLimiter(path, requests_per_minute=2, tokens_per_minute=1000)
+    second = RateLimiter(path, requests_per_minute=2, tokens_per_minute=1000)
+    assert first.try_acquire(100, now=0) == 0
+    assert second.try_acquire(100, now=0) == 0
+    # Both requests are spent; one refills at 2 per minute
+    assert first.try_acquire(100, now=0) == pytest.approx(30)
+    assert second.try_acquire(100, now=30) == 0
+
+
+@pytest.mark.unit
+def test_token_budget_and_usage_settlement(tmp_path):
+    """
+    Test that calls wait for tokens, and actual usage above the reservation is charged.
+    """
+    limiter = RateLimiter(str(tmp_path / "rate.json"), requests_per_minute=100, tokens_per_minute=600)
+    assert limiter.try_acquire(500, now=0) == 0
+    assert limiter.try_acquire(200, now=0) == pytest.approx(10)
+    limiter.record_usage(reserved=500, used=600, now=0)
+    assert limiter.try_acquire(100, now=10) == 0
+    # Oversized calls wait for a full bucket rather than forever
+    assert limiter.try_acquire(10_000, now=10) == pytest.approx(60)
+
+
+@pytest.mark.unit
+def test_throttling_slows_every_limiter_until_calls_succeed(tmp_path):
+    """
+    Test that a throttle halves the shared refill rate and successes restore it.
+    """
+    path = str(tmp_path / "rate.json")
+    limiter = RateLimiter(path, requests_per_minute=60, tokens_per_minute=60000)
+    limiter.record_throttle(now=0)
+    other = RateLimiter(path, requests_per_minute=60, tokens_per_minute=60000)
+    assert other.scale(now=0) == 0.5
+    assert other.try_acquire(1, now=0) == pytest.approx(2)
+    for _ in range(20):
+        limiter.record_usage(1, 1, now=2)
+    assert other.scale(now=2) == 1.0
+
+
+@pytest.mark.unit
+def test_handler_reserves_before_calls_and_settles_after(tmp_path):
+    """
+    Test that a chat model with the handler takes its estimated tokens from the bucket.
+    """
+    limiter = RateLimiter(str(tmp_path / "rate.json"), requests_per_minute=10, tokens_per_minute=1000)
+    llm = FakeListChatModel(responses=["ok"], callbacks=[RateLimitHandler(limiter)])
+    assert llm.invoke("x" * 400).content == "ok"
+    # No usage reported, so the reservation stands
+    state = limiter._update(dict)
+    assert state["requests"] == pytest.approx(9, abs=0.01)
+    assert state["tokens"] == pytest.approx(1000 - estimate_tokens("x" * 400), abs=1)
@@ -0,0 +1,186 @@
+"""
+Metadata index saved next to a FAISS store, for pre-filtered search.
+
+Every FAISS row's session item id, host, path, method, status and mimetype
+are kept in an indexed SQLite table, so a question like "all POSTs under
+/taskManager/" resolves to the matching rows first and the vector search
+then runs over only those rows, with full recall, instead of post-filtering
+a global top-k.
+"""
+
+import os
+import sqlite3
+from typing import Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from session_store import where_clause
+
+METADATA_INDEX_FILE = "metadata_index.sqlite"
+# Stored as PRAGMA user_version; bump it when the rows table changes (2 added id)
+SCHEMA_VERSION = 2
+FILTER_FIELDS = ("method", "host", "path_prefix", "status", "mimetype")
+
+
+def row_fields(metadata: dict) -> tuple:
+    """(id, host, path, method, status, mimetype) of a chunk, falling back to its url."""
+    parts = urlsplit(metadata.get("url") or "")
+    status = metadata.get("status")
+    return (
+        metadata.get("id"),
+        metadata.get("host") or parts.hostname,
+        metadata.get("path") or parts.path or None,
+        (metadata.get("method") or "").upper() or None,
+        int(status) if str(status).isdigit() else None,
+        metadata.get("mimetype"),
+    )
+
+
+class MetadataIndex:
+    """FAISS row lookup by session item filters."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    @classmethod
+    def build(cls, metadatas: Iterable[dict], db_path: str = ":memory:") -> "MetadataIndex":
+        """Index the metadata of each row, in FAISS row order, into db_path."""
+        tmp_path = db_path + ".tmp" if db_path != ":memory:" else db_path
+        if tmp_path != db_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        conn = sqlite3.connect(tmp_path, check_same_thread=False)
+        conn.executescript(
+            """
+            CREATE TABLE rows (
+                row INTEGER PRIMARY KEY,
+                id INTEGER, host TEXT, path TEXT, method TEXT, status INTEGER, mimetype TEXT
+            );
+            """
+        )
+        conn.executemany(
+            "INSERT INTO rows (row, id, host, path, method, status, mimetype) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            ((row, *row_fields(metadata)) for row, metadata in enumerate(metadatas)),
+        )
+        conn.executescript(
+            """
+            CREATE INDEX rows_id ON rows (id);
+            CREATE INDEX rows_endpoint ON rows (method, host, path);
+            CREATE INDEX rows_path ON rows (path);
+            CREATE INDEX rows_status ON rows (status);
+            CREATE INDEX rows_mimetype ON rows (mimetype);
+            """
+        )
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.commit()
+        if tmp_path == db_path:
+            return cls(conn)
+        conn.close()
+        os.replace(tmp_path, db_path)
+        return cls.open(db_path)
+
+    @classmethod
+    def open(cls, db_path: str) -> "MetadataIndex":
+        return cls(sqlite3.connect(db_path, check_same_thread=False))
+
+    @property
+    def version(self) -> int:
+        return self.conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def rows(self, **filters) -> List[int]:
+        """FAISS rows matching method, host, path_prefix, status, mimetype and ids filters."""
+        where, params = where_clause(**filters)
+        return [row for (row,) in self.conn.execute(f"SELECT row FROM rows{where} ORDER BY row", params)]
+
+    def indexed_fields(self) -> List[str]:
+        """The FILTER_FIELDS that at least one row has a value for."""
+        columns = {"path_prefix": "path"}
+        return [
+            field for field in FILTER_FIELDS
+            if self.conn.execute(f"SELECT 1 FROM rows WHERE {columns.get(field, field)} IS NOT NULL LIMIT 1").fetchone()
+        ]
+
+    def count(self, **filters) -> int:
+        where, params = where_clause(**filters)
+        return self.conn.execute(f"SELECT COUNT(*) FROM rows{where}", params).fetchone()[0]
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def store_metadatas(db) -> Iterable[dict]:
+    """The metadata of a LangChain FAISS store in row order."""
+    for row in range(db.index.ntotal):
+        yield db.docstore.search(db.index_to_docstore_id[row]).metadata
+
+
+def build_metadata_index(db, path: str) -> MetadataIndex:
+    """Build and save the metadata index for a store saved at path."""
+    return MetadataIndex.build(store_metadatas(db), os.path.join(path, METADATA_INDEX_FILE))
+
+
+def load_metadata_index(db, path: str) -> MetadataIndex:
+    """
+    Open the metadata index saved with a store. An index saved with an older
+    schema is rebuilt in place; stores saved before the index existed, or
+    whose index no longer matches, get one built in memory.
+    """
+    db_path = os.path.join(path, METADATA_INDEX_FILE)
+    if os.path.isfile(db_path):
+        index = MetadataIndex.open(db_path)
+        if index.version != SCHEMA_VERSION:
+            print(f"Rebuilding metadata index for {path} (schema version {index.version}, expected {SCHEMA_VERSION})")
+            index.close()
+            return build_metadata_index(db, path)
+        if index.count() == db.index.ntotal:
+            return index
+        index.close()
+    print(f"Building metadata index for {path}")
+    return MetadataIndex.build(store_metadatas(db))
+
+
+def filters_from_env() -> dict:
+    """Session filters from SESSION_FILTER_METHOD, _HOST, _PATH_PREFIX, _STATUS and _MIMETYPE."""
+    filters = {field: os.getenv(f"SESSION_FILTER_{field.upper()}") for field in FILTER_FIELDS}
+    return {field: value for field, value in filters.items() if value}
+
+
+def filtered_rows(index: MetadataIndex, filters: dict) -> List[int]:
+    """
+    Rows matching filters. Raises ValueError when none do, naming the fields
+    the store has values for, so a filter on a field it never recorded does
+    not silently leave the retriever with empty context.
+    """
+    rows = index.rows(**filters)
+    if rows:
+        return rows
+    indexed = index.indexed_fields()
+    message = f"No rows match {filters}; indexed fields: {', '.join(indexed) or 'none'}"
+    unrecorded = [field for field in filters if field not in indexed]
+    if unrecorded:
+        message += f" ({', '.join(unrecorded)} not recorded in this store; rebuild it to filter on them)"
+    raise ValueError(message)
+
+
+def search_rows(index, query, k: int, rows: Optional[List[int]] = None) -> Tuple[list, list]:
+    """
+    Search a faiss index for the k nearest neighbours of query (1 x d float32),
+    restricted to rows when given. Flat indexes filter with an IDSelectorBatch;
+    approximate ones rank the reconstructed subset exactly so recall stays full.
+    Returns (distances, rows) for the single query.
+    """
+    import faiss
+    import numpy as np
+
+    if rows is None:
+        distances, found = index.search(query, k)
+    elif not rows:
+        return [], []
+    elif isinstance(index, faiss.IndexFlatCodes):
+        selector = faiss.IDSelectorBatch(np.asarray(rows, dtype=np.int64))
+        distances, found = index.search(query, min(k, len(rows)), params=faiss.SearchParameters(sel=selector))
+    else:
+        subset = faiss.IndexFlat(index.d, index.metric_type)
+        subset.add(index.reconstruct_batch(np.asarray(rows, dtype=np.int64)))
+        distances, positions = subset.search(query, min(k, len(rows)))
+        found = np.asarray(rows)[positions]
+    keep = found[0] != -1
+    return distances[0][keep].tolist(), [int(row) for row in found[0][keep]]
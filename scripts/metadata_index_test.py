@@ -0,0 +1,100 @@
+import sqlite3
+
+import faiss
+import numpy as np
+import pytest
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from metadata_index import (
+    METADATA_INDEX_FILE,
+    SCHEMA_VERSION,
+    MetadataIndex,
+    filtered_rows,
+    load_metadata_index,
+    row_fields,
+    search_rows,
+)
+
+metadatas = [
+    {"id": 1, "method": "GET", "url": "https://vtm.rdpt.dev/taskManager/", "status": "200", "mimetype": "HTML"},
+    {"id": 2, "method": "POST", "url": "https://vtm.rdpt.dev/taskManager/login/", "status": "302", "mimetype": ""},
+    {"id": 3, "method": "POST", "url": "https://vtm.rdpt.dev/taskManager/task/7/edit", "status": "200"},
+    {"id": 4, "method": "post", "url": "https://other.example/api/upload"},
+]
+
+
+@pytest.mark.unit
+def test_row_fields_fall_back_to_url():
+    """
+    Test that host and path come from the url when not stored explicitly.
+    """
+    assert row_fields(metadatas[3]) == (4, "other.example", "/api/upload", "POST", None, None)
+    assert row_fields({"host": "h", "path": "/p", "status": 404}) == (None, "h", "/p", None, 404, None)
+
+
+@pytest.mark.unit
+def test_rows_pre_filter_by_metadata(tmp_path):
+    """
+    Test that filters resolve to the matching FAISS rows, in row order.
+    """
+    index = MetadataIndex.build(metadatas, str(tmp_path / "metadata_index.sqlite"))
+    assert index.rows(method="POST", path_prefix="/taskManager/") == [1, 2]
+    assert index.rows(method="post") == [1, 2, 3]
+    assert index.rows(host="vtm.rdpt.dev", status=200) == [0, 2]
+    assert index.rows(mimetype="HTML") == [0]
+    assert index.rows(ids=[2, 4]) == [1, 3]
+    assert index.count() == 4
+
+
+@pytest.mark.unit
+def test_filters_matching_nothing_name_the_indexed_fields():
+    """
+    Test that a filter selecting no rows raises and lists the fields the store has values for.
+    """
+    index = MetadataIndex.build([{key: m[key] for key in ("id", "method", "url")} for m in metadatas])
+    assert index.indexed_fields() == ["method", "host", "path_prefix"]
+    assert filtered_rows(index, {"method": "GET"}) == [0]
+    with pytest.raises(ValueError, match=r"indexed fields: method, host, path_prefix \(mimetype not recorded"):
+        filtered_rows(index, {"mimetype": "HTML"})
+    with pytest.raises(ValueError, match=r"indexed fields: method, host, path_prefix$"):
+        filtered_rows(index, {"method": "DELETE"})
+
+
+@pytest.mark.unit
+def test_search_rows_only_returns_selected_rows():
+    """
+    Test that filtered search ranks only the selected rows, for flat and approximate indexes.
+    """
+    vectors = np.random.default_rng(3).random((200, 8), dtype=np.float32)
+    query = vectors[:1]
+    rows = list(range(100, 200, 7))
+    flat = faiss.IndexFlatL2(8)
+    flat.add(vectors)
+    hnsw = faiss.IndexHNSWFlat(8, 16)
+    hnsw.add(vectors)
+    expected = sorted(rows, key=lambda row: float(((vectors[row] - query[0]) ** 2).sum()))[:5]
+    for index in (flat, hnsw):
+        _, found = search_rows(index, query, 5, rows)
+        assert found == expected
+    assert search_rows(flat, query, 5, [])[1] == []
+    assert search_rows(flat, query, 1)[1] == [0]
+
+
+@pytest.mark.unit
+def test_index_with_old_schema_is_rebuilt(tmp_path):
+    """
+    Test that an index saved before the id column existed is rebuilt instead of failing on queries.
+    """
+    db = FAISS.from_texts([str(m["id"]) for m in metadatas], DeterministicFakeEmbedding(size=8), metadatas=metadatas)
+    conn = sqlite3.connect(tmp_path / METADATA_INDEX_FILE)
+    conn.executescript(
+        """
+        CREATE TABLE rows (row INTEGER PRIMARY KEY, host TEXT, path TEXT, method TEXT, status INTEGER, mimetype TEXT);
+        INSERT INTO rows (row) VALUES (0), (1), (2), (3);
+        """
+    )
+    conn.close()
+    index = load_metadata_index(db, str(tmp_path))
+    assert index.version == SCHEMA_VERSION
+    assert index.rows(ids=[2, 4]) == [1, 3]
+    assert MetadataIndex.open(str(tmp_path / METADATA_INDEX_FILE)).version == SCHEMA_VERSION
@@ -0,0 +1,159 @@
+"""
+Pickle-free, memory-mapped docstore for saved vector databases.
+
+Documents are stored as a UTF-8 text blob with an int64 offset table, plus
+JSON metadata and the original document ids in the same blob/offset layout.
+Nothing is deserialized at load time: documents are read lazily by FAISS row
+at query time, so load time and resident memory do not grow with the corpus.
+
+The docstore is only used while index.faiss is unchanged since conversion;
+a store rebuilt with save_local falls back to its pickle until reconverted.
+
+Files written next to index.faiss:
+
+    docstore.json                      format header: document count and the
+                                       size and mtime of the index it matches
+    docstore.bin / docstore.offsets    page contents
+    metadata.bin / metadata.offsets    metadata as compact JSON
+    ids.bin / ids.offsets              original document ids
+"""
+
+import json
+import mmap
+import os
+import struct
+from collections.abc import Mapping
+from typing import Iterable, List, Optional, Union
+
+from langchain_community.docstore.base import Docstore
+from langchain_core.documents import Document
+
+HEADER_FILE = "docstore.json"
+FORMAT_NAME = "mmap-docstore"
+FORMAT_VERSION = 1
+
+
+class _Blob:
+    """A memory-mapped sequence of byte strings addressed by row."""
+
+    def __init__(self, path: str, name: str):
+        self._data = self._map(os.path.join(path, f"{name}.bin"))
+        offsets = self._map(os.path.join(path, f"{name}.offsets"))
+        self._offsets = memoryview(offsets).cast("q") if offsets else []
+
+    @staticmethod
+    def _map(file_path: str):
+        with open(file_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return b""
+            # The mapping stays valid after the file object is closed
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __getitem__(self, row: int) -> str:
+        return bytes(self._data[self._offsets[row] : self._offsets[row + 1]]).decode("utf-8")
+
+
+class _Writer:
+    def __init__(self, path: str, name: str):
+        self._data = open(os.path.join(path, f"{name}.bin"), "wb")
+        self._offsets = open(os.path.join(path, f"{name}.offsets"), "wb")
+        self._position = 0
+        self._offsets.write(struct.pack("<q", 0))
+
+    def append(self, value: str) -> None:
+        encoded = value.encode("utf-8")
+        self._data.write(encoded)
+        self._position += len(encoded)
+        self._offsets.write(struct.pack("<q", self._position))
+
+    def close(self) -> None:
+        self._data.close()
+        self._offsets.close()
+
+
+class RowMapping(Mapping):
+    """index_to_docstore_id for mmap stores: FAISS row i is docstore key i."""
+
+    def __init__(self, count: int):
+        self._count = count
+
+    def __getitem__(self, row: int) -> int:
+        if not 0 <= row < self._count:
+            raise KeyError(row)
+        return row
+
+    def __iter__(self):
+        return iter(range(self._count))
+
+    def __len__(self) -> int:
+        return self._count
+
+
+class MmapDocstore(Docstore):
+    """Read-only docstore that fetches documents lazily from memory-mapped files."""
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, HEADER_FILE), "r", encoding="utf-8") as f:
+            header = json.load(f)
+        if header.get("format") != FORMAT_NAME or header.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported docstore format in {path}: {header}")
+        self.count = header["count"]
+        self._texts = _Blob(path, "docstore")
+        self._metadata = _Blob(path, "metadata")
+        self._ids = _Blob(path, "ids")
+
+    def search(self, search: Union[int, str]) -> Union[str, Document]:
+        row = int(search)
+        if not 0 <= row < self.count:
+            return f"ID {search} not found."
+        return Document(
+            id=self._ids[row] or None,
+            page_content=self._texts[row],
+            metadata=json.loads(self._metadata[row]),
+        )
+
+
+def _index_stat(path: str) -> dict:
+    stat = os.stat(os.path.join(path, "index.faiss"))
+    return {"index_size": stat.st_size, "index_mtime_ns": stat.st_mtime_ns}
+
+
+def is_mmap_store(path: str) -> bool:
+    """Whether path holds an mmap docstore that still matches its index.faiss."""
+    try:
+        with open(os.path.join(path, HEADER_FILE), "r", encoding="utf-8") as f:
+            header = json.load(f)
+        stat = _index_stat(path)
+    except (OSError, ValueError):
+        return False
+    return all(header.get(key) == value for key, value in stat.items())
+
+
+def write_docstore(path: str, documents: Iterable[Document], ids: Optional[List[str]] = None) -> int:
+    """Write documents, in FAISS row order, as an mmap docstore. Returns the count."""
+    writers = {name: _Writer(path, name) for name in ("docstore", "metadata", "ids")}
+    count = 0
+    try:
+        for row, doc in enumerate(documents):
+            writers["docstore"].append(doc.page_content)
+            writers["metadata"].append(json.dumps(doc.metadata, separators=(",", ":"), default=str))
+            doc_id = ids[row] if ids else doc.id
+            writers["ids"].append(str(doc_id) if doc_id is not None else "")
+            count += 1
+    finally:
+        for writer in writers.values():
+            writer.close()
+    with open(os.path.join(path, HEADER_FILE), "w", encoding="utf-8") as f:
+        json.dump({"format": FORMAT_NAME, "version": FORMAT_VERSION, "count": count, **_index_stat(path)}, f)
+    return count
+
+
+def convert_store(db, path: str) -> int:
+    """
+    Write the docstore of a loaded FAISS store to path in mmap format,
+    next to its existing index.faiss. The pickle is left in place.
+    """
+    rows = range(db.index.ntotal)
+    ids = [str(db.index_to_docstore_id[row]) for row in rows]
+    documents = (db.docstore.search(doc_id) for doc_id in ids)
+    return write_docstore(path, documents, ids=ids)
@@ -0,0 +1,44 @@
+import os
+import pytest
+from langchain_core.documents import Document
+from mmap_docstore import MmapDocstore, is_mmap_store, write_docstore
+
+documents = [
+    Document(page_content="first chunk", metadata={"source": "a.rb"}),
+    Document(page_content="", metadata={}),
+    Document(page_content="ünïcode chunk", metadata={"source": "b.rb", "start_index": 3}),
+]
+
+
+def write_store(path):
+    with open(os.path.join(path, "index.faiss"), "wb") as f:
+        f.write(b"index")
+    return write_docstore(str(path), documents, ids=["a.rb#0", "a.rb#1", "b.rb#0"])
+
+
+@pytest.mark.unit
+def test_docstore_round_trip(tmp_path):
+    """
+    Test that documents are read back by row with their metadata and ids.
+    """
+    assert write_store(tmp_path) == 3
+    docstore = MmapDocstore(str(tmp_path))
+    assert docstore.count == 3
+    for row, expected in enumerate(documents):
+        doc = docstore.search(row)
+        assert doc.page_content == expected.page_content
+        assert doc.metadata == expected.metadata
+    assert docstore.search("2").id == "b.rb#0"
+    assert isinstance(docstore.search(3), str)
+
+
+@pytest.mark.unit
+def test_docstore_goes_stale_when_index_changes(tmp_path):
+    """
+    Test that a rebuilt index.faiss invalidates the converted docstore.
+    """
+    write_store(tmp_path)
+    assert is_mmap_store(str(tmp_path))
+    with open(os.path.join(tmp_path, "index.faiss"), "ab") as f:
+        f.write(b"rebuilt")
+    assert not is_mmap_store(str(tmp_path))
@@ -0,0 +1,102 @@
+"""
+Vectorized maximal marginal relevance (MMR) retrieval.
+
+LangChain's MMR recomputes the similarity of every candidate to every
+selected document at each greedy step, which dominates retrieval time for
+k=100. Here the candidate-by-candidate similarity matrix is computed once
+per query with one matrix product, and each step only folds the newly
+selected column into a running maximum.
+
+LangChain also caps the candidates at fetch_k=20 by default, so k=100
+silently returned 20 documents; fetch_k is now chosen from k and the index
+size instead.
+"""
+
+import os
+from typing import List, Optional
+
+import numpy as np
+from langchain_community.vectorstores import FAISS
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from metadata_index import search_rows
+
+# Candidates per requested document, and an upper bound on candidates
+FETCH_MULTIPLIER = int(os.getenv("MMR_FETCH_MULTIPLIER", "4"))
+MAX_FETCH_K = int(os.getenv("MMR_MAX_FETCH_K", "500"))
+
+
+def adaptive_fetch_k(k: int, ntotal: int, multiplier: int = FETCH_MULTIPLIER, cap: int = MAX_FETCH_K) -> int:
+    """
+    Candidates to fetch for k results: multiplier * k, at most cap (but
+    never fewer than k), and the whole index when it is that small.
+    """
+    return min(ntotal, max(k, min(k * multiplier, cap)))
+
+
+def maximal_marginal_relevance(
+    query_embedding: np.ndarray,
+    embeddings: np.ndarray,
+    k: int = 4,
+    lambda_mult: float = 0.5,
+) -> List[int]:
+    """
+    Greedy MMR selection over candidate embeddings (n x d) using cosine
+    similarity. Returns the indices of the selected candidates in order.
+    """
+    if len(embeddings) == 0 or k <= 0:
+        return []
+    candidates = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(candidates, axis=1, keepdims=True)
+    candidates = candidates / np.where(norms == 0, 1, norms)
+    query = np.asarray(query_embedding, dtype=np.float32).reshape(-1)
+    query = query / (np.linalg.norm(query) or 1)
+
+    query_similarity = candidates @ query
+    # Computed once and reused by every greedy step
+    pair_similarity = candidates @ candidates.T
+
+    selected = [int(np.argmax(query_similarity))]
+    redundancy = pair_similarity[selected[0]].copy()
+    available = np.ones(len(candidates), dtype=bool)
+    available[selected[0]] = False
+    while len(selected) < min(k, len(candidates)):
+        scores = lambda_mult * query_similarity - (1 - lambda_mult) * redundancy
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        np.maximum(redundancy, pair_similarity[best], out=redundancy)
+    return selected
+
+
+class MMRRetriever(BaseRetriever):
+    store: FAISS
+    k: int = 4
+    lambda_mult: float = 0.5
+    # None: chosen by adaptive_fetch_k
+    fetch_k: Optional[int] = None
+    # Restrict the search to these FAISS rows, e.g. from a metadata index
+    rows: Optional[List[int]] = None
+
+    def search_by_vector(self, embedding: List[float]) -> List[Document]:
+        index = self.store.index
+        size = index.ntotal if self.rows is None else len(self.rows)
+        fetch_k = self.fetch_k or adaptive_fetch_k(self.k, size)
+        query = np.array([embedding], dtype=np.float32)
+        _, rows = search_rows(index, query, fetch_k, self.rows)
+        if not rows:
+            return []
+        candidates = index.reconstruct_batch(np.asarray(rows, dtype=np.int64))
+        chosen = maximal_marginal_relevance(query[0], candidates, k=self.k, lambda_mult=self.lambda_mult)
+        return [self.store.docstore.search(self.store.index_to_docstore_id[rows[i]]) for i in chosen]
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return self.search_by_vector(self.store.embedding_function.embed_query(query))
+
+
+def mmr_retriever(db: FAISS, k: int = 4, **kwargs) -> MMRRetriever:
+    """Drop-in for db.as_retriever(search_type="mmr", search_kwargs={"k": k})."""
+    return MMRRetriever(store=db, k=k, **kwargs)
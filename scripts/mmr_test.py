@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+from mmr import adaptive_fetch_k, maximal_marginal_relevance
+
+
+def reference_mmr(query, embeddings, k, lambda_mult):
+    """Unvectorized greedy MMR, recomputing similarities at every step."""
+
+    def cosine(a, b):
+        return float(a @ b / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+    selected = []
+    while len(selected) < min(k, len(embeddings)):
+        best, best_score = None, -np.inf
+        for i, candidate in enumerate(embeddings):
+            if i in selected:
+                continue
+            redundancy = max((cosine(candidate, embeddings[j]) for j in selected), default=0.0)
+            score = lambda_mult * cosine(candidate, query) - (1 - lambda_mult) * redundancy
+            if not selected:
+                score = cosine(candidate, query)
+            if score > best_score:
+                best, best_score = i, score
+        selected.append(best)
+    return selected
+
+
+@pytest.mark.unit
+def test_mmr_matches_reference_selection():
+    """
+    Test that the vectorized selection matches the step-by-step greedy MMR.
+    """
+    rng = np.random.default_rng(7)
+    embeddings = rng.normal(size=(60, 16)).astype(np.float32)
+    query = rng.normal(size=16).astype(np.float32)
+    for lambda_mult in (0.0, 0.5, 1.0):
+        assert maximal_marginal_relevance(query, embeddings, k=10, lambda_mult=lambda_mult) == reference_mmr(
+            query, embeddings, 10, lambda_mult
+        )
+
+
+@pytest.mark.unit
+def test_adaptive_fetch_k():
+    """
+    Test that fetch_k scales with k but stays within the index and the cap.
+    """
+    assert adaptive_fetch_k(8, 10000) == 32
+    assert adaptive_fetch_k(100, 10000) == 400
+    assert adaptive_fetch_k(200, 10000) == 500
+    assert adaptive_fetch_k(600, 10000) == 600
+    assert adaptive_fetch_k(30, 50) == 50
@@ -0,0 +1,55 @@
+"""
+Error classification and jittered backoff shared by the Bedrock callers.
+
+LangChain re-raises most Bedrock failures as a plain ValueError carrying the
+original message, so errors are classified by exception type and message
+rather than by botocore error code alone.
+"""
+
+import random
+
+THROTTLING = "throttling"
+TRANSIENT = "transient"
+FATAL = "fatal"
+
+THROTTLING_MARKERS = (
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "ServiceQuotaExceededException",
+    "Too many requests",
+    "Rate exceeded",
+)
+
+TRANSIENT_MARKERS = (
+    "ServiceUnavailableException",
+    "InternalServerException",
+    "ModelNotReadyException",
+    "ModelTimeoutException",
+    "ReadTimeoutError",
+    "ConnectTimeoutError",
+    "EndpointConnectionError",
+    "ConnectionClosedError",
+    "Connection reset",
+    "timed out",
+)
+
+
+def classify_error(error: BaseException) -> str:
+    """Classify an exception as throttling, transient or fatal."""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        text = f"{type(error).__name__}: {error}"
+        if any(marker in text for marker in THROTTLING_MARKERS):
+            return THROTTLING
+        if any(marker in text for marker in TRANSIENT_MARKERS):
+            return TRANSIENT
+        if isinstance(error, (ConnectionError, TimeoutError)):
+            return TRANSIENT
+        error = error.__cause__ or error.__context__
+    return FATAL
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 60.0) -> float:
+    """Exponential backoff with full jitter for the given zero-based attempt."""
+    return random.uniform(0, min(cap, base * 2**attempt))
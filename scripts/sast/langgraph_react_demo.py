@@ -1,10 +1,13 @@
 from langchain.agents import create_react_agent, AgentExecutor
-from langchain_aws import ChatBedrock
 from langchain_core.prompts import PromptTemplate
 from dotenv import load_dotenv
 import os
+import sys
 import git
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from llm_factory import get_llm
+
 # Import our custom tools
 from view_file_tools import ViewFileTool, ViewFileLinesTool
 from view_directory_tools import (
@@ -37,10 +40,7 @@ tools = [
     FileListingTool(),
     DirectoryStructureTool(),
 ]
-llm = ChatBedrock(
-    model_id="us.anthropic.claude-3-5-haiku-20241022-v1:0",
-    model_kwargs={"temperature": 0.6},
-)
+llm = get_llm(temperature=0.6)
 
 
 # Define instructions and prompt
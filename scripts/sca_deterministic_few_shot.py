@@ -1,10 +1,12 @@
 import os
+import asyncio
 import git
-from langchain_aws import ChatBedrock
-from langchain_core.runnables import RunnablePassthrough
+from operator import itemgetter
+from llm_factory import estimate_tokens, get_llm, get_response_cache
+from context_packing import CallUsage, batch_input, pack_files, packing_report, split_response, usage_report
+from retry_policy import FATAL, backoff_delay, classify_error
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate, FewShotChatMessagePromptTemplate
-import time
 
 
 # Load Env Variables
@@ -38,10 +40,7 @@ for root, _, files in os.walk(local_path):
             except Exception as e:
                 print(f"Error reading {file_path}: {e}")
 
-llm = ChatBedrock(
-    model_id='us.anthropic.claude-3-5-haiku-20241022-v1:0',
-    model_kwargs={"temperature": 0.2},
-)
+llm = get_llm(temperature=0.2)
 
 system_prompt_template = """
 You are a helpful secure code review assistant who is given acess to a
@@ -138,35 +137,90 @@ SQL Injection vulnerablities. Only tell me about the code that is vulnerable
 to SQL Injection. Don't mention code that is not vulnerable to SQL Injection.
 """
 
-# Now we will iterate over the Python files and analyze them
-# and store the results for later processing
-for file_path, content in python_files.items():
-    code = content
-    # Retrieve filename for reference
-    filename = file_path
-    # Create a chain of operations to run the code through
-    chain = (
-        { "context": RunnablePassthrough() , "question": RunnablePassthrough()}
-        | final_prompt
-        | llm
-        | StrOutputParser()
-    )
-
-    # This is an optional addition to stream the output in chunks
-    # for a chat-like experience
-    title = f"\n\nAnalyzing code from {filename}"
-    print(title)
-    print("=" * len(title))
-    try:
-        for chunk in chain.stream({"question": question,"context": code}):
-            print(chunk, end="", flush=True)
-    except Exception as e:
-        time.sleep(30)
-        continue
-
-
-
-
-
+chain = (
+    {"context": itemgetter("context"), "question": itemgetter("question")}
+    | final_prompt
+    | llm
+    | StrOutputParser()
+)
 
-    
+# Files analyzed concurrently, and attempts per file before it is reported as failed
+workers = int(os.getenv("SCA_WORKERS", "8"))
+max_attempts = int(os.getenv("SCA_MAX_ATTEMPTS", "6"))
+
+
+async def analyze_files(files, batches):
+    """
+    Analyze batches of files from a shared work queue. A throttled or
+    transient failure puts the batch back on the queue after a jittered
+    exponential backoff, so other batches keep progressing meanwhile; files
+    a packed answer leaves out are queued again on their own. Fatal errors
+    and files out of attempts are returned as {filename: (kind, error)}.
+    """
+    queue = asyncio.Queue()
+    for batch in batches:
+        queue.put_nowait((batch, 0))
+    failed = {}
+    retrying = set()
+    done = 0
+
+    async def requeue(job, delay):
+        await asyncio.sleep(delay)
+        await queue.put(job)
+        # Marked done only once resubmitted, so queue.join() waits for the retry
+        queue.task_done()
+
+    async def worker():
+        nonlocal done
+        while True:
+            batch, attempt = await queue.get()
+            name = batch[0] if len(batch) == 1 else f"{len(batch)} packed files"
+            try:
+                response = await chain.ainvoke(batch_input(batch, files, question), config={"callbacks": [usage]})
+            except Exception as e:
+                kind = classify_error(e)
+                if kind == FATAL or attempt + 1 >= max_attempts:
+                    failed.update({filename: (kind, str(e)) for filename in batch})
+                    queue.task_done()
+                    continue
+                delay = backoff_delay(attempt)
+                print(f"=> {name}: {kind} error, retrying in {delay:.1f}s (attempt {attempt + 2}/{max_attempts})")
+                retry = asyncio.create_task(requeue((batch, attempt + 1), delay))
+                # Hold a reference so the pending retry is not garbage collected
+                retrying.add(retry)
+                retry.add_done_callback(retrying.discard)
+                continue
+            results, missing = split_response(batch, response)
+            for filename, result in results.items():
+                done += 1
+                title = f"\n\n[{done}/{len(files)}] Analyzing code from {filename}"
+                print(f"{title}\n{'=' * len(title)}\n{result}", flush=True)
+            if missing:
+                print(f"=> {len(missing)} files missing from a packed answer, analyzing them one by one")
+            for filename in missing:
+                queue.put_nowait(([filename], 0))
+            queue.task_done()
+
+    tasks = [asyncio.create_task(worker()) for _ in range(workers)]
+    await queue.join()
+    for task in tasks:
+        task.cancel()
+    return failed
+
+
+# Small files share a call up to PACK_TOKEN_BUDGET code tokens (0: one file per call)
+batches = pack_files(python_files)
+print(f"Analyzing {len(python_files)} files in {len(batches)} calls ({workers} workers)")
+prompt_tokens = estimate_tokens(final_prompt.format(context="", question=question))
+print(packing_report(batches, python_files, prompt_tokens))
+# Counts the calls actually made, including retries and files re-analyzed alone
+usage = CallUsage()
+failed = asyncio.run(analyze_files(python_files, batches))
+if failed:
+    print(f"\n{len(failed)} of {len(python_files)} files failed permanently:")
+    for filename, (kind, error) in sorted(failed.items()):
+        print(f"- {filename} ({kind}): {error}")
+print(usage_report(usage, python_files, prompt_tokens))
+response_cache = get_response_cache()
+if response_cache is not None:
+    print(response_cache.report())
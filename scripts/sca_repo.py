@@ -1,13 +1,16 @@
 import os
+import asyncio
 import git
-from langchain_aws import ChatBedrock
-from langchain_aws import BedrockEmbeddings
-from langchain_core.runnables import RunnablePassthrough
+from operator import itemgetter
+from llm_factory import estimate_tokens, get_llm, get_response_cache
+from context_packing import CallUsage, batch_input, pack_files, packing_report, split_response, usage_report
+from embedding_cache import get_embeddings
+from embedding_executor import build_index
+from index_types import save_store
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import FAISS
 
 # Load Env Variables
 from dotenv import load_dotenv
@@ -42,12 +45,9 @@ for root, _, files in os.walk(local_path):
                 print(f"Error reading {file_path}: {e}")
 
 
-llm = ChatBedrock(
-    model_id="us.anthropic.claude-3-5-haiku-20241022-v1:0",
-    model_kwargs={"temperature": 0.2},
-)
+llm = get_llm(temperature=0.2)
 
-embeddings = BedrockEmbeddings(model_id="amazon.titan-embed-text-v2:0")
+embeddings = get_embeddings(model_id="amazon.titan-embed-text-v2:0")
 
 system_prompt_template = """
 You are a helpful code review assistant who is 
@@ -73,44 +73,80 @@ Analyze the provided code for any security
 flaws you find in it and produce a summary of that analysis.
 """
 
-# Now we will iterate over the Python files and analyze them
-# and store the results for later processing
-docs = []
-for file_path, content in python_files.items():
-    response_array = []
-    code = content
-    # Retrieve filename for reference
-    filename = file_path
-    # Create a chain of operations to run the code through
-    chain = (
-        {"context": RunnablePassthrough(), "question": RunnablePassthrough()}
-        | prompt
-        | llm
-        | StrOutputParser()
-    )
-
-    # This is an optional addition to stream the output in chunks
-    # for a chat-like experience
-    title = f"\n\nAnalyzing code from {filename}"
-    print(title)
-    print("=" * len(title))
-    for chunk in chain.stream({"question": question, "context": code}):
-        print(chunk, end="", flush=True)
-        response_array.append(chunk)
-
-    flattened_response = "".join(response_array)
-    document = Document(
-        page_content=flattened_response, metadata={"filename": filename}
-    )
-
-    docs.append(document)
-
+chain = (
+    {"context": itemgetter("context"), "question": itemgetter("question")}
+    | prompt
+    | llm
+    | StrOutputParser()
+)
 
 text_splitter = RecursiveCharacterTextSplitter(chunk_size=8000, chunk_overlap=100)
 
 # CHANGE AS DESIRED
 name_of_scan_results_db = "repo_scan_results_faiss"
 
-texts = text_splitter.split_documents(docs)
-db = FAISS.from_documents(texts, embeddings)
-db.save_local(f"../vector_databases/{name_of_scan_results_db}")
+# Files analyzed concurrently; the shared rate limiter caps the actual request rate
+workers = int(os.getenv("SCA_WORKERS", "8"))
+
+
+async def analyze_files(files, batches):
+    """
+    Analyze batches of files concurrently, printing each file's result as
+    one block when its batch finishes and adding it to the scan-results
+    store straight away. Files a packed answer leaves out are analyzed alone.
+    """
+    semaphore = asyncio.Semaphore(workers)
+    # FAISS adds are not thread-safe, so embedding and adding happen one file at a time
+    index_lock = asyncio.Lock()
+    db = None
+    done = 0
+
+    def add_result(db, filename, response):
+        document = Document(page_content=response, metadata={"filename": filename})
+        texts = text_splitter.split_documents([document])
+        ids = [f"{filename}#{i}" for i in range(len(texts))]
+        return build_index(texts, embeddings, db=db, ids=ids, verbose=False)
+
+    async def worker(batch):
+        nonlocal db, done
+        async with semaphore:
+            try:
+                response = await chain.ainvoke(batch_input(batch, files, question), config={"callbacks": [usage]})
+            except Exception as e:
+                results, missing, failed = {filename: f"Error: {e}" for filename in batch}, [], True
+            else:
+                (results, missing), failed = split_response(batch, response), False
+        for filename, result in results.items():
+            done += 1
+            title = f"\n\n[{done}/{len(files)}] Analyzing code from {filename}"
+            print(f"{title}\n{'=' * len(title)}\n{result}", flush=True)
+            if not failed:
+                async with index_lock:
+                    db = await asyncio.to_thread(add_result, db, filename, result)
+        if missing:
+            print(f"=> {len(missing)} files missing from a packed answer, analyzing them one by one")
+            await asyncio.gather(*(worker([filename]) for filename in missing))
+
+    await asyncio.gather(*(worker(batch) for batch in batches))
+    return db
+
+
+# Small files share a call up to PACK_TOKEN_BUDGET code tokens (0: one file per call)
+batches = pack_files(python_files)
+print(f"Analyzing {len(python_files)} files in {len(batches)} calls ({workers} workers)")
+prompt_tokens = estimate_tokens(prompt.format(context="", question=question))
+print(packing_report(batches, python_files, prompt_tokens))
+# Counts the calls actually made, including retries and files re-analyzed alone
+usage = CallUsage()
+db = asyncio.run(analyze_files(python_files, batches))
+if db is not None:
+    save_store(
+        db,
+        f"../vector_databases/{name_of_scan_results_db}",
+        source={"type": "scan_results", "chunk_size": 8000, "chunk_overlap": 100},
+    )
+print(embeddings.report())
+print(usage_report(usage, python_files, prompt_tokens))
+response_cache = get_response_cache()
+if response_cache is not None:
+    print(response_cache.report())
@@ -9,23 +9,17 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # For BedRock
-from langchain_aws import ChatBedrock
-from langchain_aws import BedrockEmbeddings
+from llm_factory import get_llm
+from hybrid_retriever import get_hybrid_retriever
 
 # CHANGE AS NEEDED
 name_of_faiss_db = "repo_scan_results_faiss"
 
 faiss_db_path = f"../vector_databases/{name_of_faiss_db}"
-db = FAISS.load_local(
-    faiss_db_path,
-    BedrockEmbeddings(model_id="amazon.titan-embed-text-v2:0"),
-    allow_dangerous_deserialization=True,
-)
 
-retriever = db.as_retriever(
-    search_type="mmr",
-    search_kwargs={"k": 100},
-)
+# Fuses BM25 and vector ranks, so exact identifiers such as cursor.execute
+# are found without retrieving (and paying for) 100 chunks
+retriever = get_hybrid_retriever(faiss_db_path, k=20, fetch_k=100)
 
 system_prompt_template = """
 You are a highly skilled pplication security expert. 
@@ -56,10 +50,7 @@ prompt = ChatPromptTemplate.from_messages(
     ]
 )
 
-llm = ChatBedrock(
-    model_id="us.anthropic.claude-3-5-haiku-20241022-v1:0",
-    model_kwargs={"temperature": 0.6},
-)
+llm = get_llm(temperature=0.6)
 
 chain = (
     {"context": retriever, "question": RunnablePassthrough()}
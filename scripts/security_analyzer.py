@@ -1,5 +1,5 @@
 from langchain.agents import create_react_agent
-from langchain_aws import ChatBedrock
+from llm_factory import get_llm
 from langchain_core.prompts import PromptTemplate
 from langchain.agents import AgentExecutor
 from pydantic import BaseModel, Field
@@ -50,10 +50,7 @@ class ViewFileTool(BaseTool):
 
 # Define tools and LLM
 tools = [ListFilesTool(), ViewFileTool()]
-llm = ChatBedrock(
-    model_id='us.anthropic.claude-3-5-haiku-20241022-v1:0',
-    model_kwargs={"temperature": 0.6},
-)
+llm = get_llm(temperature=0.6)
 
 # Define instructions and prompt
 instructions = """
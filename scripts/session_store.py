@@ -0,0 +1,183 @@
+"""
+Indexed SQLite cache of a Burp session export.
+
+The XML export is converted once into an SQLite file next to it holding the
+decoded requests and responses, indexed by endpoint and status. The cache is
+rebuilt automatically whenever the source XML changes.
+"""
+
+import hashlib
+import os
+import sqlite3
+from collections import namedtuple
+from typing import Iterator, List, Optional
+
+from burp_session import iter_session
+
+SCHEMA_VERSION = 1
+
+StoredItem = namedtuple(
+    "StoredItem",
+    ["id", "url", "method", "host", "port", "protocol", "path", "status", "mimetype",
+     "content_hash", "request", "response"],
+)
+
+ITEM_COLUMNS = ", ".join(StoredItem._fields)
+
+
+def _source_hash(xml_file: str) -> str:
+    digest = hashlib.sha256()
+    with open(xml_file, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _build(xml_file: str, db_path: str, source_hash: str) -> None:
+    tmp_path = db_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    conn.executescript(
+        """
+        CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE items (
+            id INTEGER PRIMARY KEY,
+            url TEXT, method TEXT, host TEXT, port INTEGER, protocol TEXT,
+            path TEXT, status INTEGER, mimetype TEXT, content_hash TEXT,
+            request TEXT, response TEXT
+        );
+        """
+    )
+    rows = []
+    for item in iter_session(xml_file):
+        request, response = item.request, item.response
+        content_hash = hashlib.sha256(f"{request}\n\n{response}".encode("utf-8")).hexdigest()
+        rows.append((
+            item.id, item.url, item.method, item.host,
+            int(item.port) if item.port and item.port.isdigit() else None,
+            item.protocol, item.path,
+            int(item.status) if item.status and item.status.isdigit() else None,
+            item.mimetype, content_hash, request, response,
+        ))
+        if len(rows) >= 500:
+            conn.executemany(f"INSERT INTO items ({ITEM_COLUMNS}) VALUES ({','.join('?' * 12)})", rows)
+            rows = []
+    if rows:
+        conn.executemany(f"INSERT INTO items ({ITEM_COLUMNS}) VALUES ({','.join('?' * 12)})", rows)
+    conn.executescript(
+        """
+        CREATE INDEX items_endpoint ON items (method, host, path);
+        CREATE INDEX items_path ON items (path);
+        CREATE INDEX items_status ON items (status);
+        CREATE INDEX items_mimetype ON items (mimetype);
+        """
+    )
+    stat = os.stat(xml_file)
+    conn.executemany(
+        "INSERT INTO meta (key, value) VALUES (?, ?)",
+        [
+            ("schema_version", str(SCHEMA_VERSION)),
+            ("source_size", str(stat.st_size)),
+            ("source_mtime_ns", str(stat.st_mtime_ns)),
+            ("source_sha256", source_hash),
+        ],
+    )
+    conn.commit()
+    conn.close()
+    os.replace(tmp_path, db_path)
+
+
+def _is_fresh(xml_file: str, db_path: str) -> bool:
+    if not os.path.isfile(db_path):
+        return False
+    conn = sqlite3.connect(db_path)
+    try:
+        try:
+            meta = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+        except sqlite3.DatabaseError:
+            return False
+        if meta.get("schema_version") != str(SCHEMA_VERSION):
+            return False
+        stat = os.stat(xml_file)
+        if meta.get("source_size") == str(stat.st_size) and meta.get("source_mtime_ns") == str(stat.st_mtime_ns):
+            return True
+        # Touched but not necessarily changed: fall back to the content hash
+        if meta.get("source_sha256") != _source_hash(xml_file):
+            return False
+        conn.execute("UPDATE meta SET value = ? WHERE key = 'source_mtime_ns'", (str(stat.st_mtime_ns),))
+        conn.commit()
+        return True
+    finally:
+        conn.close()
+
+
+def where_clause(method=None, host=None, path_prefix=None, status=None, mimetype=None, ids=None):
+    """SQL WHERE clause and parameters for the item filters shared by every session index."""
+    clauses, params = [], []
+    if ids is not None:
+        ids = list(ids)
+        clauses.append(f"id IN ({','.join('?' * len(ids))})")
+        params.extend(ids)
+    if method:
+        clauses.append("method = ?")
+        params.append(method.upper())
+    if host:
+        clauses.append("host = ?")
+        params.append(host)
+    if path_prefix:
+        clauses.append("substr(path, 1, ?) = ?")
+        params.extend([len(path_prefix), path_prefix])
+    if status is not None:
+        clauses.append("status = ?")
+        params.append(int(status))
+    if mimetype:
+        clauses.append("mimetype = ?")
+        params.append(mimetype)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+class SessionStore:
+    """Read-only queries over a converted session."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+
+    def items(self, **filters) -> Iterator[StoredItem]:
+        """
+        Yield items in session order, optionally filtered by method, host,
+        path_prefix, status, mimetype or a collection of ids.
+        """
+        where, params = where_clause(**filters)
+        for row in self.conn.execute(f"SELECT {ITEM_COLUMNS} FROM items{where} ORDER BY id", params):
+            yield StoredItem(*row)
+
+    def count(self, **filters) -> int:
+        where, params = where_clause(**filters)
+        return self.conn.execute(f"SELECT COUNT(*) FROM items{where}", params).fetchone()[0]
+
+    def get(self, id: int) -> Optional[StoredItem]:
+        row = self.conn.execute(f"SELECT {ITEM_COLUMNS} FROM items WHERE id = ?", (id,)).fetchone()
+        return StoredItem(*row) if row else None
+
+    def endpoints(self) -> List[tuple]:
+        """Return (method, host, path, count) for every distinct endpoint."""
+        return self.conn.execute(
+            "SELECT method, host, path, COUNT(*) FROM items GROUP BY method, host, path ORDER BY MIN(id)"
+        ).fetchall()
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def open_session_store(xml_file: str, db_path: Optional[str] = None) -> SessionStore:
+    """
+    Open the SQLite cache for xml_file, converting the export first if the
+    cache is missing or the XML has changed since it was built.
+    """
+    db_path = db_path or os.path.splitext(xml_file)[0] + ".sqlite"
+    if not _is_fresh(xml_file, db_path):
+        print(f"Converting {xml_file} to {db_path}")
+        _build(xml_file, db_path, _source_hash(xml_file))
+    return SessionStore(db_path)
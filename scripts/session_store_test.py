@@ -0,0 +1,77 @@
+import os
+import shutil
+import pytest
+from session_store import open_session_store, where_clause
+
+xml_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "vtm-session.xml")
+
+
+@pytest.fixture
+def session_copy(tmp_path):
+    path = tmp_path / "vtm-session.xml"
+    shutil.copy(xml_file, path)
+    return str(path)
+
+
+@pytest.mark.unit
+def test_cache_is_built_once_and_reused(session_copy, capsys):
+    """
+    Test that the export is converted on first open and the SQLite cache is reused afterwards.
+    """
+    store = open_session_store(session_copy)
+    assert "Converting" in capsys.readouterr().out
+    assert store.count() == 53
+    assert store.get(1).url == "https://vtm.rdpt.dev/"
+    store.close()
+
+    # A touched but unchanged export is recognized by its content hash
+    os.utime(session_copy, ns=(0, 0))
+    store = open_session_store(session_copy)
+    assert capsys.readouterr().out == ""
+    assert store.count() == 53
+    store.close()
+
+
+@pytest.mark.unit
+def test_cache_is_rebuilt_when_the_export_changes(session_copy, capsys):
+    """
+    Test that editing the XML invalidates the cache.
+    """
+    open_session_store(session_copy).close()
+    capsys.readouterr()
+    with open(session_copy) as f:
+        xml = f.read()
+    # Drop the last item
+    last = xml.rindex("<item>")
+    with open(session_copy, "w") as f:
+        f.write(xml[:last] + "</items>\n")
+    store = open_session_store(session_copy)
+    assert "Converting" in capsys.readouterr().out
+    assert store.count() == 52
+    assert store.get(53) is None
+
+
+@pytest.mark.unit
+def test_where_clause_composes_filters():
+    """
+    Test that filters are joined with AND and passed as parameters, not interpolated.
+    """
+    assert where_clause() == ("", [])
+    where, params = where_clause(method="post", path_prefix="/taskManager/", status="200", ids=[3, 5])
+    assert where == " WHERE id IN (?,?) AND method = ? AND substr(path, 1, ?) = ? AND status = ?"
+    assert params == [3, 5, "POST", 13, "/taskManager/", 200]
+    where, params = where_clause(host="vtm.rdpt.dev", mimetype="HTML")
+    assert (where, params) == (" WHERE host = ? AND mimetype = ?", ["vtm.rdpt.dev", "HTML"])
+
+
+@pytest.mark.unit
+def test_items_are_filtered_in_session_order(session_copy):
+    """
+    Test that store queries apply the filters and keep session order.
+    """
+    store = open_session_store(session_copy)
+    posts = list(store.items(method="POST"))
+    assert posts and all(item.method == "POST" for item in posts)
+    assert [item.id for item in posts] == sorted(item.id for item in posts)
+    assert store.count(method="POST") == len(posts)
+    assert [item.id for item in store.items(ids=[5, 2])] == [2, 5]
@@ -0,0 +1,91 @@
+"""
+Catalog of the vector databases under vector_databases/.
+
+Each entry describes a store from its index.json (embedding model and
+dimension, index type, source type and chunk parameters) and its index
+header (document count), without loading documents. Stores saved before
+index.json recorded their source fall back to LEGACY_SOURCES, which
+leaves their chunk parameters unknown, and their embedding model is
+inferred from the index dimension.
+
+Usage (from scripts/):
+    python store_catalog.py
+"""
+
+import os
+from collections import namedtuple
+from typing import Dict
+
+from index_types import read_index_metadata
+from vector_store_registry import embedding_settings, read_index
+
+CATALOG_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "vector_databases")
+
+# Source types of the shipped stores. Their chunk parameters were never
+# recorded and the loaders may have changed since, so they stay unknown
+LEGACY_SOURCES = {
+    "acmeco_sec_guide_faiss": {"type": "guide"},
+    "bridge_troll_faiss": {"type": "code"},
+    "juice_shop.faiss": {"type": "code"},
+    "repo_scan_results_faiss": {"type": "scan_results"},
+    "taskmanager_faiss": {"type": "code"},
+    "vtm_faiss": {"type": "code"},
+    "vtm_session.faiss": {"type": "http_session"},
+}
+
+StoreEntry = namedtuple(
+    "StoreEntry",
+    ["name", "path", "model_id", "dimensions", "index_type", "doc_count", "source_type",
+     "chunk_size", "chunk_overlap"],
+)
+
+
+def describe_store(path: str) -> StoreEntry:
+    name = os.path.basename(os.path.normpath(path))
+    metadata = read_index_metadata(path)
+    # The index is memory-mapped and documents are not loaded
+    index = read_index(path, mmap=True)
+    model_id, dimensions = embedding_settings(path)
+    source = metadata.get("source") or LEGACY_SOURCES.get(name, {})
+    return StoreEntry(
+        name=name,
+        path=path,
+        model_id=model_id,
+        dimensions=dimensions,
+        index_type=metadata["index_type"],
+        doc_count=index.ntotal,
+        source_type=source.get("type"),
+        chunk_size=source.get("chunk_size"),
+        chunk_overlap=source.get("chunk_overlap"),
+    )
+
+
+def catalog(root: str = CATALOG_ROOT) -> Dict[str, StoreEntry]:
+    """Every store under root that has an index.faiss, by name."""
+    entries = {}
+    for name in sorted(os.listdir(root)):
+        path = os.path.join(root, name)
+        if os.path.isfile(os.path.join(path, "index.faiss")):
+            entries[name] = describe_store(path)
+    return entries
+
+
+def resolve(name_or_path: str, root: str = CATALOG_ROOT) -> StoreEntry:
+    """Look a store up by catalog name, or describe the store at a path."""
+    if os.path.isdir(name_or_path):
+        return describe_store(name_or_path)
+    path = os.path.join(root, name_or_path)
+    if not os.path.isfile(os.path.join(path, "index.faiss")):
+        raise KeyError(f"No store named {name_or_path!r} in {root}")
+    return describe_store(path)
+
+
+if __name__ == "__main__":
+    print(f"{'name':<26}{'model':<32}{'dims':>6}{'index':>10}{'docs':>7}  {'source':<14}{'chunk':>7}{'overlap':>9}")
+    for entry in catalog().values():
+        print(
+            f"{entry.name:<26}{entry.model_id:<32}{entry.dimensions:>6}{entry.index_type:>10}{entry.doc_count:>7}  "
+            f"{entry.source_type or '-':<14}"
+            f"{'-' if entry.chunk_size is None else entry.chunk_size:>7}"
+            f"{'-' if entry.chunk_overlap is None else entry.chunk_overlap:>9}"
+        )
@@ -0,0 +1,176 @@
+"""
+Process-wide registry of loaded vector stores.
+
+Stores are loaded lazily on first use, shared by every script and tool in
+the process, and evicted least-recently-used once their combined footprint
+exceeds the configured budget.
+"""
+
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from langchain_community.vectorstores import FAISS
+
+from embedding_cache import DEFAULT_MODEL_ID, NATIVE_DIMENSIONS, get_embeddings
+from index_types import apply_index_metadata, read_index_metadata
+from mmap_docstore import MmapDocstore, RowMapping, is_mmap_store
+
+DEFAULT_MAX_BYTES = int(os.getenv("VECTOR_STORE_CACHE_MB", "2048")) * 1024 * 1024
+# Map indexes read-only so concurrent processes share the page cache
+MMAP_INDEXES = os.getenv("FAISS_MMAP", "true").lower() == "true"
+
+
+def store_footprint(path: str) -> int:
+    """
+    Approximate the resident size of a store by the size of its files on disk.
+    Memory-mapped docstores are paged in by the OS on demand and not counted.
+    """
+    if is_mmap_store(path):
+        return os.path.getsize(os.path.join(path, "index.faiss"))
+    return sum(
+        os.path.getsize(os.path.join(path, name))
+        for name in os.listdir(path)
+        if os.path.isfile(os.path.join(path, name))
+    )
+
+
+def read_index(path: str, mmap: bool = MMAP_INDEXES):
+    """
+    Read index.faiss, memory-mapped and read-only when mmap is set. Falls back
+    to a private in-memory copy for index types this faiss build cannot map.
+    """
+    import faiss
+
+    file_path = os.path.join(path, "index.faiss")
+    if mmap:
+        flags = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+        try:
+            return faiss.read_index(file_path, flags)
+        except RuntimeError as e:
+            print(f"Could not memory-map {file_path}, reading it instead: {e}")
+    return faiss.read_index(file_path)
+
+
+def load_store(path: str, embeddings, writable: bool = False) -> FAISS:
+    """
+    Load a saved store from disk for searching. The index is memory-mapped
+    (see read_index) and stores converted with convert_docstore.py open their
+    documents memory-mapped instead of unpickling index.pkl. Pass
+    writable=True to get a private copy that supports adds and deletes.
+    """
+    if writable:
+        db = FAISS.load_local(path, embeddings, allow_dangerous_deserialization=True)
+        apply_index_metadata(db.index, path)
+        return db
+    index = read_index(path)
+    apply_index_metadata(index, path)
+    if is_mmap_store(path):
+        docstore = MmapDocstore(path)
+        index_to_docstore_id = RowMapping(docstore.count)
+    else:
+        # Same trust model as FAISS.load_local(allow_dangerous_deserialization=True)
+        with open(os.path.join(path, "index.pkl"), "rb") as f:
+            docstore, index_to_docstore_id = pickle.load(f)
+    return FAISS(
+        embedding_function=embeddings,
+        index=index,
+        docstore=docstore,
+        index_to_docstore_id=index_to_docstore_id,
+    )
+
+
+def embedding_settings(path: str, model_id: str = DEFAULT_MODEL_ID) -> tuple:
+    """
+    The embedding model id and dimension a store was built with, as recorded
+    in its index.json. For stores saved before that, the model is inferred
+    from the index dimension (e.g. 1536 is Titan v1), else model_id is assumed.
+    """
+    recorded = read_index_metadata(path).get("embedding", {})
+    if recorded.get("model_id"):
+        return recorded["model_id"], recorded.get("dimensions") or NATIVE_DIMENSIONS.get(recorded["model_id"])
+    dimensions = recorded.get("dimensions") or read_index(path).d
+    native = [model for model, size in NATIVE_DIMENSIONS.items() if size == dimensions]
+    if model_id not in native and native:
+        model_id = native[0]
+    return model_id, dimensions
+
+
+def check_embeddings(embeddings, path: str) -> None:
+    """Refuse to query a store with embeddings of a different model or dimension."""
+    if not hasattr(embeddings, "model_id"):
+        return
+    expected = embedding_settings(path, embeddings.model_id)
+    actual = (embeddings.model_id, embeddings.dimensions or NATIVE_DIMENSIONS.get(embeddings.model_id))
+    if actual != expected:
+        raise ValueError(f"{path} was built with {expected} embeddings, not {actual}")
+
+
+class VectorStoreRegistry:
+    """Thread-safe, footprint-bounded LRU cache of loaded vector stores keyed by path."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._stores = OrderedDict()  # path -> (store, footprint)
+        self._loading = {}  # path -> lock held while that store loads
+        self._embeddings = {}  # (model id, dimensions) -> shared embeddings client
+        self._lock = threading.Lock()
+
+    def _shared_embeddings(self, model_id: str, dimensions: Optional[int] = None):
+        with self._lock:
+            if (model_id, dimensions) not in self._embeddings:
+                self._embeddings[model_id, dimensions] = get_embeddings(model_id=model_id, dimensions=dimensions)
+            return self._embeddings[model_id, dimensions]
+
+    def get(self, path: str, embeddings=None, model_id: str = DEFAULT_MODEL_ID) -> FAISS:
+        """
+        Return the store saved at path, loading it on first use. Without
+        embeddings, queries use the model and dimension the store was built with.
+        """
+        key = os.path.realpath(path)
+        with self._lock:
+            if key in self._stores:
+                self._stores.move_to_end(key)
+                return self._stores[key][0]
+            load_lock = self._loading.setdefault(key, threading.Lock())
+
+        # Only one thread loads a given store; the others wait and reuse it
+        with load_lock:
+            with self._lock:
+                if key in self._stores:
+                    self._stores.move_to_end(key)
+                    return self._stores[key][0]
+            if embeddings is None:
+                embeddings = self._shared_embeddings(*embedding_settings(key, model_id))
+            check_embeddings(embeddings, key)
+            store = load_store(key, embeddings)
+            footprint = store_footprint(key)
+            with self._lock:
+                self._stores[key] = (store, footprint)
+                self._loading.pop(key, None)
+                self._evict(keep=key)
+            return store
+
+    def _evict(self, keep: str) -> None:
+        total = sum(footprint for _, footprint in self._stores.values())
+        for key in list(self._stores):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            total -= self._stores.pop(key)[1]
+
+    def evict(self, path: str) -> None:
+        """Drop a store, e.g. after it has been rebuilt on disk."""
+        with self._lock:
+            self._stores.pop(os.path.realpath(path), None)
+
+
+registry = VectorStoreRegistry()
+
+
+def get_vector_store(path: str, embeddings=None, model_id: str = DEFAULT_MODEL_ID) -> FAISS:
+    """Return the shared, lazily loaded store saved at path."""
+    return registry.get(path, embeddings=embeddings, model_id=model_id)